@@ -1 +1,5 @@
 # auth-api package
+import time
+
+# Reference point for the import time in the startup report (app.core.startup)
+IMPORT_STARTED_AT = time.perf_counter()
@@ -0,0 +1,158 @@
+"""Administrative commands: ``python -m app.cli <command> --help``."""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.async_session import AsyncSessionLocal, async_engine
+from app.db.schema import SCHEMA_VERSION
+from app.db.session import create_tables
+from app.src.auth.importer import UserImporter
+from app.src.auth.repository import AsyncUserRepository
+from app.src.auth.security import calibrate_bcrypt_rounds, hashing_engine
+
+
+def _read_rows(path: Path) -> List[Dict[str, Any]]:
+    """Rows from a CSV file (with a header), JSON Lines, or a JSON array."""
+    if path.suffix == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            return [
+                {key: value or None for key, value in row.items()} for row in csv.DictReader(handle)
+            ]
+
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".jsonl", ".ndjson"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    rows: List[Dict[str, Any]] = json.loads(text)
+    return rows
+
+
+async def _import_users(path: Path, batch_size: int, report_path: Optional[Path]) -> int:
+    rows = _read_rows(path)
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await UserImporter(batch_size=batch_size).run(db, rows)
+    finally:
+        hashing_engine.shutdown()
+        await async_engine.dispose()
+
+    if report_path is not None:
+        report_path.write_text(report.model_dump_json(indent=2, exclude_none=True))
+    for result in report.results:
+        if not result.success:
+            print(f"row {result.index}: {result.error}", file=sys.stderr)
+    print(f"created={report.created} failed={report.failed}")
+    return 0 if report.failed == 0 else 1
+
+
+async def _startup_report() -> int:
+    # Importing app.main here is part of what gets measured
+    from app.core.startup import startup_report
+    from app.main import shutdown_event, startup_event
+
+    await startup_event()
+    await startup_report.wait_for_background()
+    print(json.dumps(startup_report.as_dict(), indent=2))
+    await shutdown_event()
+    return 0
+
+
+async def _migrate() -> int:
+    # Postgres builds new indexes CONCURRENTLY: slow on big tables, but writes go on
+    missing = create_tables(build_online_indexes=True)
+    try:
+        async with AsyncSessionLocal() as db:
+            conflicts = await AsyncUserRepository().case_conflicts(db)
+    finally:
+        await async_engine.dispose()
+
+    for name, values in conflicts.items():
+        for value in values:
+            print(
+                f"warning: several users share the {name} {value!r} ignoring case; "
+                f"rename all but one so uq_users_{name}_lower can be built",
+                file=sys.stderr,
+            )
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "case_conflicts": conflicts,
+        "missing_indexes": missing,
+    }
+    print(json.dumps(report, indent=2))
+    return 1 if missing else 0
+
+
+def _write_env_setting(path: Path, key: str, value: Any) -> None:
+    """Set ``key=value`` in a dotenv file, replacing an existing assignment."""
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    assignment = f"{key}={value}"
+    for n, line in enumerate(lines):
+        if line.split("=", 1)[0].strip() == key:
+            lines[n] = assignment
+            break
+    else:
+        lines.append(assignment)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _calibrate_bcrypt(
+    target_ms: float, min_rounds: int, max_rounds: int, env_file: Optional[Path]
+) -> int:
+    result = calibrate_bcrypt_rounds(target_ms / 1000, min_rounds, max_rounds)
+    if result["verify_ms"] > target_ms:
+        print(
+            f"warning: cost {min_rounds} already takes {result['verify_ms']} ms here",
+            file=sys.stderr,
+        )
+    if env_file is not None:
+        _write_env_setting(env_file, "BCRYPT_ROUNDS", result["rounds"])
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_users = commands.add_parser(
+        "import-users", help="create users from a CSV, JSON Lines or JSON file"
+    )
+    import_users.add_argument("file", type=Path)
+    import_users.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    import_users.add_argument("--report", type=Path, help="write the per-row report as JSON")
+
+    commands.add_parser(
+        "migrate", help="create missing tables and indexes, report case-insensitive duplicates"
+    )
+
+    commands.add_parser(
+        "startup-report", help="start the app once and print import/startup timings as JSON"
+    )
+
+    calibrate = commands.add_parser(
+        "calibrate-bcrypt", help="pick the bcrypt cost that verifies within a target time"
+    )
+    calibrate.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    calibrate.add_argument("--min-rounds", type=int, default=10)
+    calibrate.add_argument("--max-rounds", type=int, default=16)
+    calibrate.add_argument("--write-env", type=Path, help="store BCRYPT_ROUNDS in this .env file")
+
+    args = parser.parse_args(argv)
+    if args.command == "import-users":
+        return asyncio.run(_import_users(args.file, args.batch_size, args.report))
+    if args.command == "migrate":
+        return asyncio.run(_migrate())
+    if args.command == "startup-report":
+        return asyncio.run(_startup_report())
+    if args.command == "calibrate-bcrypt":
+        return _calibrate_bcrypt(args.target_ms, args.min_rounds, args.max_rounds, args.write_env)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
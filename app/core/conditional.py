@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping
+
+from fastapi import Response, status
+
+
+def entity_tag(id: Any, updated_at: datetime) -> str:
+    """Strong ETag for a row whose every change bumps ``updated_at``."""
+    return f'"{id}-{_as_utc(updated_at).timestamp() * 1_000_000:.0f}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps in the database are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: datetime) -> bool:
+    """Whether a GET with these request headers can be answered with 304 (RFC 9110 §13.1).
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only consulted without
+    it, at the one-second resolution of HTTP dates.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" matches "x"
+        return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def conditional_response(
+    headers: Mapping[str, str],
+    etag: str,
+    last_modified: datetime,
+    render: Callable[[], Response],
+    cache_control: str,
+    vary: str = "",
+) -> Response:
+    """``render()``'s response with validators, or a bodiless 304 without calling it."""
+    validators: Dict[str, str] = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": cache_control,
+    }
+    if vary:
+        validators["Vary"] = vary
+
+    if is_not_modified(headers, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+    response = render()
+    response.headers.update(validators)
+    return response
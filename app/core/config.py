@@ -35,13 +35,124 @@ class Settings(BaseSettings):
         )
     )
 
+    # Read replicas (comma-separated). Repository reads marked for replicas go to a
+    # healthy one; replicas lagging more than DB_REPLICA_MAX_LAG_SECONDS or failing
+    # are skipped. A user who just changed their data reads from the primary for
+    # DB_REPLICA_STICKY_SECONDS (remembered for up to DB_REPLICA_STICKY_USERS users).
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_SECONDS: float = 5.0
+    DB_REPLICA_STICKY_SECONDS: float = 10.0
+    DB_REPLICA_STICKY_USERS: int = 10000
+
     DB_SSLMODE: str | None = os.getenv("DB_SSLMODE", "require")
     DB_SCHEMA: str = os.getenv("DB_SCHEMA", "auth_api")
 
+    # Connection pool. DB_POOL_PROFILE: default | pgbouncer | nullpool; when unset,
+    # Supabase's transaction pooler (:6543) selects pgbouncer and DB_USE_NULLPOOL=true
+    # keeps the old connection-per-request behaviour.
+    DB_POOL_PROFILE: str | None = None
+    DB_USE_NULLPOOL: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 2
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Asymmetric signing (RS*/ES* algorithms): <kid>.pem private keys and <kid>.pub.pem
+    # retired public keys. JWT_ACTIVE_KID picks the signing key (default: last kid).
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    # "fast": precomputed headers/keys (HS*, RS*, ES*); "jose": python-jose
+    JWT_CODEC: str = "fast"
+    JWKS_CACHE_MAX_AGE_SECONDS: int = 3600
+
+    # Batch introspection for gateways, which must send INTROSPECTION_API_KEY in the
+    # X-Introspection-Key header; the endpoint answers 503 while it is unset
+    INTROSPECTION_API_KEY: str | None = None
+    INTROSPECTION_MAX_TOKENS: int = 100
+
+    # "full": create_all + inline pool warmup on every start.
+    # "fast" (scale-to-zero): one schema_version query, warmups in the background.
+    STARTUP_MODE: str = "full"
+    STARTUP_BACKGROUND_WARMUP: bool = True
+
+    # Reject unauthenticated requests in an ASGI middleware, outside its public routes
+    AUTH_MIDDLEWARE_ENABLED: bool = False
+
+    # Prometheus /metrics endpoint and request latency middleware
+    METRICS_ENABLED: bool = True
+    # Scrapers must then send "Authorization: Bearer <key>"; unset, /metrics is open
+    # and must only be reachable from the internal network
+    METRICS_API_KEY: str | None = None
+
+    # Cache-Control for GET /auth/me and /auth/users/{id}; clients revalidate with the
+    # ETag/Last-Modified they got and receive a bodiless 304 while nothing changed
+    USER_CACHE_CONTROL: str = "private, no-cache"
+
+    # Rows fetched per server-side cursor round trip by GET /auth/users/export
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    # Rows per POST /auth/users/import call: hashing them holds the request (and hashing
+    # workers) for seconds, so bigger files go through `python -m app.cli import-users`
+    IMPORT_MAX_ROWS: int = 200
+    # Rows per uniqueness query, hashing fan-out and INSERT, for the API and the CLI;
+    # capped at 32767 // columns (asyncpg's parameter limit), about 3600
+    IMPORT_BATCH_SIZE: int = 1000
+
+    # First scheme hashes new passwords (bcrypt | argon2, which needs argon2-cffi); hashes
+    # in other listed schemes or at another cost are re-hashed on the next login.
+    # Pick BCRYPT_ROUNDS for this hardware with `python -m app.cli calibrate-bcrypt`.
+    PASSWORD_SCHEMES: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_TARGET_MS: int = 250
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456
+
+    # Password hashing engine: bcrypt runs in a process pool so it doesn't hold the GIL
+    # of the serving process. HASH_WORKERS=0 falls back to the event loop's thread pool.
+    HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+    HASH_MAX_PENDING: int = 64
+    HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # Login throttling, checked before the user lookup and bcrypt. Per client IP: every
+    # attempt; per email/username: failures, then a lockout that doubles each time.
+    # LOGIN_RATE_LIMIT_BACKEND: memory (per worker) | redis (shared, needs `redis`).
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_BACKEND: str = "memory"
+    LOGIN_RATE_LIMIT_REDIS_URL: str | None = None
+    LOGIN_IP_MAX_ATTEMPTS: int = 30
+    LOGIN_IP_WINDOW_SECONDS: int = 60
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 900
+    LOGIN_LOCKOUT_SECONDS: int = 60
+    LOGIN_LOCKOUT_MAX_SECONDS: int = 3600
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are trusted
+    TRUSTED_PROXY_HOPS: int = 0
+
+    # In-process cache of authenticated users (USER_CACHE_SIZE=0 disables it)
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    # Already-verified access tokens, each kept until its own ``exp`` (0 disables it)
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Cross-worker invalidation of the caches above over Postgres LISTEN/NOTIFY. LISTEN
+    # needs a session-mode connection: behind pgbouncer/Supabase :6543 set
+    # CACHE_INVALIDATION_URL to the direct (:5432) URL, or the listener stays off.
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_URL: str | None = None
+
+    # Token revocation: in-memory denylist, re-synced from the revoked_tokens table
+    REVOCATION_REFRESH_SECONDS: float = 5.0
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+
     HOST: str = os.getenv("HOST", "0.0.0.0")
     # Render provides PORT env var; fall back to 8000 locally
     PORT: int = int(os.getenv("PORT", "8000"))
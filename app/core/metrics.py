@@ -0,0 +1,129 @@
+import time
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+PASSWORD_HASHING_SECONDS = Histogram(
+    "password_hashing_seconds",
+    "CPU time spent in bcrypt, measured inside the hashing worker",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+PASSWORD_HASHING_QUEUE_SECONDS = Histogram(
+    "password_hashing_queue_seconds",
+    "Time a bcrypt job waited for a hashing worker",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+JWT_SECONDS = Histogram(
+    "jwt_seconds",
+    "JWT signing and verification time (decode only counts token cache misses)",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Database statement execution time, by statement type",
+    ["operation"],
+    buckets=DB_BUCKETS,
+)
+DB_SESSION_REQUESTS = Counter(
+    "db_session_requests_total",
+    "Requests that declared a database session, by whether they ever used it",
+    ["used"],
+)
+LOGIN_THROTTLED = Counter(
+    "login_throttled_total",
+    "Login attempts answered with 429 before any lookup or bcrypt work",
+    ["scope"],
+)
+
+_STATEMENT_TYPES = {"select", "insert", "update", "delete", "with"}
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement ``engine`` executes into ``db_query_seconds``."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is None:
+            return
+        words = statement[:16].split(None, 1)
+        keyword = words[0].lower() if words else ""
+        operation = keyword if keyword in _STATEMENT_TYPES else "other"
+        DB_QUERY_SECONDS.labels(operation).observe(time.perf_counter() - started_at)
+
+
+HTTP_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE")
+)
+
+
+def method_label(scope: Scope) -> str:
+    # Clients may send any token as the method; each one would be a new series
+    method = scope["method"]
+    return method if method in HTTP_METHODS else "other"
+
+
+def route_template(scope: Scope) -> str:
+    # FastAPI leaves the route of an included router in scope["route"], whose path
+    # lacks the include prefixes; the full path is on the route context it matched
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    return str(template)
+
+
+class MetricsMiddleware:
+    """Records ``http_request_duration_seconds`` for every HTTP request.
+
+    Requests are labelled with the matched route's path template (never the raw
+    path) so ids in URLs don't create new series; anything unrouted is ``unmatched``
+    and non-standard methods are ``other``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.labels(
+                method_label(scope), route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - started_at)
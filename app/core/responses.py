@@ -0,0 +1,15 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered by orjson, which serializes datetimes natively.
+
+    Returning one from a route skips FastAPI's ``response_model`` pass, so the
+    content must already be validated.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional, Set
+
+from app import IMPORT_STARTED_AT
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STARTUP_MODES = {"full", "fast"}
+
+
+class StartupReport:
+    """Cold-start timings: module imports, each startup phase and background warmups.
+
+    Seconds are measured from when the ``app`` package started importing.
+    """
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.import_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.background: Dict[str, Any] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def mark_imported(self) -> None:
+        self.import_seconds = time.perf_counter() - self.started_at
+
+    def mark_ready(self) -> None:
+        self.ready_seconds = time.perf_counter() - self.started_at
+        logger.info("Startup report: %s", json.dumps(self.as_dict()))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - started_at, 6)
+
+    async def _background(self, name: str, job: Awaitable[Any]) -> None:
+        started_at = time.perf_counter()
+        try:
+            await job
+            self.background[name] = round(time.perf_counter() - started_at, 6)
+        except Exception:
+            self.background[name] = "failed"
+            logger.warning("Background warmup '%s' failed", name, exc_info=True)
+
+    def run_in_background(self, name: str, job: Awaitable[Any]) -> None:
+        self.background[name] = "running"
+        task = asyncio.create_task(self._background(name, job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def wait_for_background(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def cancel_background(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def as_dict(self) -> Dict[str, Any]:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 6)
+
+        return {
+            "version": settings.VERSION,
+            "startup_mode": startup_mode(),
+            "import_seconds": rounded(self.import_seconds),
+            "ready_seconds": rounded(self.ready_seconds),
+            "phases": dict(self.phases),
+            "background": dict(self.background),
+        }
+
+
+def startup_mode() -> str:
+    mode = settings.STARTUP_MODE.lower()
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"STARTUP_MODE must be one of {sorted(STARTUP_MODES)}")
+    return mode
+
+
+startup_report = StartupReport(IMPORT_STARTED_AT)
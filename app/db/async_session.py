@@ -0,0 +1,91 @@
+from typing import Any, AsyncIterator, Dict
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.lazy import LazySession, session_usage
+from app.db.pool import engine_options, install_statement_timeout, resolve_pool_profile
+from app.db.replicas import ReplicaSet, RoutingSession
+from app.db.session import pool_profile
+
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> URL:
+    """Swap the sync driver of ``database_url`` for its asyncio counterpart."""
+    url = make_url(database_url)
+    drivername = _ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    url = url.set(drivername=drivername)
+
+    # asyncpg takes ``ssl`` instead of libpq's ``sslmode``
+    if drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        sslmode = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+
+    return url
+
+
+async_database_url = to_async_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(
+    async_database_url, **engine_options(async_database_url, pool_profile, is_async=True)
+)
+install_statement_timeout(async_engine.sync_engine, pool_profile)
+instrument_engine(async_engine.sync_engine)
+
+
+def _replica_engines() -> Dict[str, AsyncEngine]:
+    engines = {}
+    urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    for n, replica_url in enumerate(urls):
+        profile = resolve_pool_profile(replica_url)
+        url = to_async_url(replica_url)
+        engine = create_async_engine(url, **engine_options(url, profile, is_async=True))
+        install_statement_timeout(engine.sync_engine, profile)
+        instrument_engine(engine.sync_engine)
+        engines[f"replica{n}"] = engine
+    return engines
+
+
+replica_set = ReplicaSet(
+    _replica_engines(),
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_SECONDS,
+)
+_session_options: Dict[str, Any] = {}
+if replica_set:
+    _session_options = {"sync_session_class": RoutingSession, "replicas": replica_set}
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+    **_session_options,
+)
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory for work that outlives the request, like streamed responses."""
+    return AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    db: LazySession[AsyncSession] = LazySession(AsyncSessionLocal)
+    try:
+        yield db  # type: ignore[misc]
+    finally:
+        if db.started:
+            await db.session.close()
+        session_usage.record(db.started)
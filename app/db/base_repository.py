@@ -1,16 +1,29 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import ColumnElement, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.base import Base
+from app.db.pagination import BACKWARD, FORWARD, Page, decode_cursor, encode_cursor
+from app.db.replicas import REPLICA_READ
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def column_values(model: Type[Base], obj_in: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+    """The fields set on ``obj_in`` that are columns of ``model``."""
+    if isinstance(obj_in, dict):
+        update_data = obj_in
+    else:
+        update_data = obj_in.model_dump(exclude_unset=True)
+    columns = model.__table__.columns
+    return {field: value for field, value in update_data.items() if field in columns}
+
+
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
@@ -32,14 +45,8 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def update(
         self, db: Session, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        for field, value in column_values(self.model, obj_in).items():
+            setattr(db_obj, field, value)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -52,3 +59,122 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.delete(obj)
         db.commit()
         return obj
+
+
+class AsyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """``BaseRepository`` counterpart for ``AsyncSession``."""
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.id == id)  # type: ignore[attr-defined]
+            .execution_options(**REPLICA_READ)
+        )
+        return result.scalars().first()
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Sequence[ColumnElement[bool]] = (),
+        columns: Sequence[Any] = (),
+    ) -> Page[Any]:
+        """Keyset page ordered by ``(created_at, id)``.
+
+        With ``columns`` (which must include ``created_at`` and ``id``), the page holds
+        plain rows of just those columns instead of ORM instances.
+
+        Seeks straight to the cursor position through the ``(created_at, id)`` index,
+        so every page costs the same regardless of depth. Raises ``InvalidCursor``.
+        """
+        created_at = self.model.created_at  # type: ignore[attr-defined]
+        id_ = self.model.id  # type: ignore[attr-defined]
+        key = tuple_(created_at, id_)
+
+        query = select(*columns) if columns else select(self.model)
+        query = query.where(*filters)
+        direction = FORWARD
+        if cursor is not None:
+            cursor_created_at, cursor_id, direction = decode_cursor(cursor)
+            cursor_key = tuple_(cursor_created_at, cursor_id)
+            query = query.where(key > cursor_key if direction == FORWARD else key < cursor_key)
+
+        if direction == FORWARD:
+            query = query.order_by(created_at, id_)
+        else:
+            query = query.order_by(created_at.desc(), id_.desc())
+
+        result = await db.execute(query.limit(limit + 1).execution_options(**REPLICA_READ))
+        items = list(result.all() if columns else result.scalars().all())
+        has_more = len(items) > limit
+        items = items[:limit]
+        if direction == BACKWARD:
+            items.reverse()
+
+        if not items:
+            return Page(items, None, None)
+
+        first, last = items[0], items[-1]
+        has_next = has_more if direction == FORWARD else True
+        has_prev = cursor is not None if direction == FORWARD else has_more
+        return Page(
+            items,
+            encode_cursor(last.created_at, last.id, FORWARD) if has_next else None,
+            encode_cursor(first.created_at, first.id, BACKWARD) if has_prev else None,
+        )
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = obj_in.model_dump()
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> ModelType:
+        for field, value in column_values(self.model, obj_in).items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_by_id(
+        self, db: AsyncSession, id: Any, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> Optional[ModelType]:
+        """``UPDATE ... RETURNING`` by primary key: no SELECT before it and no refresh after.
+
+        Returns ``None`` when no row has that id.
+        """
+        update_data = column_values(self.model, obj_in)
+        if not update_data:
+            return await self.get(db, id)
+
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**update_data)
+            .returning(self.model)
+        )
+        db_obj = result.scalars().first()
+        await db.commit()
+        return db_obj
+
+    async def delete(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await db.get(self.model, id)
+        if obj is None:
+            raise ValueError(f"Object with id {id} not found")
+        await db.delete(obj)
+        await db.commit()
+        return obj
@@ -0,0 +1,26 @@
+from typing import Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+
+def unique_violation_column(
+    exc: IntegrityError, table: str, columns: Iterable[str]
+) -> Optional[str]:
+    """Which of ``columns`` a unique-constraint ``IntegrityError`` was raised for.
+
+    Matches the constraint or index name PostgreSQL reports (``ix_<table>_<column>``
+    from ``index=True, unique=True``, ``uq_<table>_<column>_lower`` or
+    ``<table>_<column>_key``) and SQLite's ``UNIQUE constraint failed: <table>.<column>``
+    or ``index 'uq_<table>_<column>_lower'``.
+    """
+    message = str(exc.orig)
+    for column in columns:
+        markers = (
+            f"ix_{table}_{column}",
+            f"uq_{table}_{column}",
+            f"{table}_{column}_key",
+            f"{table}.{column}",
+        )
+        if any(marker in message for marker in markers):
+            return column
+    return None
@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+from app.core.metrics import DB_SESSION_REQUESTS
+
+S = TypeVar("S")
+
+
+class LazySession(Generic[S]):
+    """Stands in for a request's session and only creates it on first use.
+
+    Any attribute access (``execute``, ``get``, ``add``...) creates the real session
+    from ``factory`` and forwards to it, so requests answered from caches or
+    rejected before their first query never build session state. The connection
+    itself is still only checked out by the first statement.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: Callable[[], S]):
+        self._factory = factory
+        self._session: Optional[S] = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> S:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+
+class SessionUsage:
+    """How many requests asked for a session and how many of them actually used it."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def record(self, used: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.used += used
+        DB_SESSION_REQUESTS.labels("true" if used else "false").inc()
+
+    def as_dict(self) -> Dict[str, Any]:
+        unused = self.requests - self.used
+        return {
+            "requests": self.requests,
+            "used": self.used,
+            "unused": unused,
+            "unused_ratio": unused / self.requests if self.requests else 0.0,
+        }
+
+
+session_usage = SessionUsage()
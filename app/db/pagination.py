@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+FORWARD = "n"
+BACKWARD = "p"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(Generic[T]):
+    """One keyset page plus opaque cursors for its neighbours (``None`` at the ends)."""
+
+    def __init__(self, items: List[T], next_cursor: Optional[str], prev_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def encode_cursor(created_at: datetime, id: Any, direction: str) -> str:
+    raw = json.dumps([created_at.isoformat(), id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in (FORWARD, BACKWARD):
+            raise ValueError(direction)
+        # Both end up as query parameters; the driver would reject anything else with a 500
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise TypeError(id)
+        created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is not None:
+            raise ValueError(created_at)
+        return created_at, id, direction
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
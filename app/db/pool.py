@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, Union
+from uuid import uuid4
+
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+POOL_PROFILES = {"default", "pgbouncer", "nullpool"}
+
+
+class PoolWaitStats:
+    """How long checkouts waited on the pool (only non-zero once it is exhausted)."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        average = self.total_wait / self.checkouts if self.checkouts else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "wait_seconds_total": round(self.total_wait, 6),
+            "wait_seconds_max": round(self.max_wait, 6),
+            "wait_seconds_avg": round(average, 6),
+        }
+
+
+class _WaitTimingMixin:
+    @property
+    def wait_stats(self) -> PoolWaitStats:
+        stats = self.__dict__.get("_wait_stats")
+        if stats is None:
+            stats = self.__dict__["_wait_stats"] = PoolWaitStats()
+        return stats
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def resolve_pool_profile(database_url: str) -> str:
+    if settings.DB_POOL_PROFILE:
+        profile = settings.DB_POOL_PROFILE.lower()
+        if profile not in POOL_PROFILES:
+            raise ValueError(f"DB_POOL_PROFILE must be one of {sorted(POOL_PROFILES)}")
+        return profile
+    if settings.DB_USE_NULLPOOL:
+        return "nullpool"
+    if "supabase.com" in database_url and ":6543" in database_url:
+        return "pgbouncer"
+    return "default"
+
+
+def engine_options(url: URL, profile: str, is_async: bool) -> Dict[str, Any]:
+    """``create_engine`` keyword arguments for ``url`` under the given pool profile.
+
+    ``pgbouncer`` keeps a client-side pool but turns off server-side prepared
+    statements, which transaction-mode pgbouncer can't route back to the right
+    server connection.
+    """
+    options: Dict[str, Any] = {"echo": settings.DEBUG, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if profile == "nullpool":
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    if profile == "pgbouncer":
+        if url.drivername == "postgresql+asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        elif url.get_dialect().driver == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+
+    return options
+
+
+def install_statement_timeout(engine: Engine, profile: str) -> None:
+    """Set ``statement_timeout`` on every new server connection.
+
+    Skipped under pgbouncer, where server connections are shared between clients;
+    set it on the database role there instead.
+    """
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout_ms <= 0 or profile == "pgbouncer" or engine.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_statement_timeout(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(timeout_ms)}")
+        cursor.close()
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> None:
+    """Open ``connections`` connections up front so the first requests don't pay for them."""
+    if connections <= 0 or isinstance(engine.pool, NullPool):
+        return
+
+    async def _open_one() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.gather(*(_open_one() for _ in range(connections)))
+    except Exception:
+        logger.warning("Connection pool warmup failed", exc_info=True)
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    stats: Dict[str, Any] = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, _WaitTimingMixin):
+        stats.update(pool.wait_stats.as_dict())
+    return stats
+
+
+class PoolCollector(Collector):
+    """Exports ``pool_stats`` of each engine as gauges, read at scrape time."""
+
+    _GAUGES = {
+        "size": "Configured pool size",
+        "checked_out": "Connections currently checked out",
+        "idle": "Connections idle in the pool",
+        "overflow": "Overflow connections currently open",
+        "wait_seconds_max": "Longest wait for a pool checkout",
+    }
+
+    def __init__(self, engines: Dict[str, Union[Engine, AsyncEngine]]):
+        self.engines = engines
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        families = {
+            name: GaugeMetricFamily(f"db_pool_{name}", description, labels=["engine"])
+            for name, description in self._GAUGES.items()
+        }
+        for engine_name, engine in self.engines.items():
+            stats = pool_stats(engine.pool)
+            for name, family in families.items():
+                if name in stats:
+                    family.add_metric([engine_name], stats[name])
+        yield from families.values()
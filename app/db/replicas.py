@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Execution options of statements that may be served by a replica
+REPLICA_READ = {"replica": True}
+
+_USE_PRIMARY = "use_primary"
+_WROTE = "wrote"
+# The replica the session's latest statement was sent to
+_REPLICA = "replica"
+
+T = TypeVar("T")
+
+# Whether it is still a standby, its WAL receiver's status, and the lag: 0 when it
+# has replayed everything it received (an idle primary would otherwise look like
+# growing lag), else seconds since the last replayed commit. A standby whose
+# receiver died has replayed everything it received too, hence the status.
+_LAG_QUERY = text(
+    "SELECT pg_is_in_recovery(), (SELECT status FROM pg_stat_wal_receiver), "
+    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def mark_down(self, error: str) -> None:
+        if self.healthy:
+            logger.warning("Read replica %s is out of rotation: %s", self.name, error)
+        self.healthy = False
+        self.error = error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+        }
+
+
+class ReplicaSet:
+    """Read replicas in round-robin, minus those that are down or lag too far.
+
+    A background check measures every replica's replay lag each ``check_interval``
+    seconds; connection errors take a replica out of rotation right away. With no
+    healthy replica, ``choose`` returns ``None`` and reads go to the primary.
+    """
+
+    def __init__(self, engines: Dict[str, AsyncEngine], max_lag: float, check_interval: float):
+        self.replicas = [Replica(name, engine) for name, engine in engines.items()]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._task: Optional["asyncio.Task[None]"] = None
+        for replica in self.replicas:
+            _watch_disconnects(replica)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        if self._cycle is None:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                lag, problem = await _probe(connection)
+        except Exception as exc:
+            replica.lag = None
+            replica.mark_down(f"{type(exc).__name__}: {exc}")
+            return
+        finally:
+            replica.checked_at = time.time()
+
+        replica.lag = lag
+        if problem is not None:
+            replica.mark_down(problem)
+        elif lag > self.max_lag:
+            replica.mark_down(f"replication lag {lag:.1f}s > {self.max_lag}s")
+        elif not replica.healthy:
+            logger.info("Read replica %s is back in rotation", replica.name)
+            replica.healthy = True
+            replica.error = None
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check_all()
+            except Exception:
+                logger.exception("Failed to check read replicas")
+
+    async def start(self) -> None:
+        if not self.replicas:
+            return
+        await self.check_all()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [replica.as_dict() for replica in self.replicas]
+
+
+async def _probe(connection: AsyncConnection) -> Tuple[float, Optional[str]]:
+    """``(lag_seconds, why it can't serve reads or None)`` of the replica behind
+    ``connection``."""
+    if connection.dialect.name != "postgresql":
+        await connection.execute(text("SELECT 1"))
+        return 0.0, None
+
+    in_recovery, receiver, lag = (await connection.execute(_LAG_QUERY)).one()
+    # Not in recovery: promoted, or pointed at a primary, so nothing to lag behind
+    if in_recovery and receiver != "streaming":
+        return float(lag or 0), f"WAL receiver is {receiver or 'not running'}"
+    return float(lag or 0), None
+
+
+def _watch_disconnects(replica: Replica) -> None:
+    @event.listens_for(replica.engine.sync_engine, "handle_error")
+    def _on_error(context: Any) -> None:
+        # No connection means the connect itself failed
+        if context.is_disconnect or context.connection is None:
+            replica.mark_down(f"{type(context.original_exception).__name__}")
+
+
+class RoutingSession(Session):
+    """Sends statements marked with ``REPLICA_READ`` to a replica, everything else
+    to the primary.
+
+    Once a session has written, or was pinned with ``use_primary``, it reads from
+    the primary too, so it always sees its own changes.
+    """
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        if (
+            self.replicas
+            and isinstance(clause, Select)
+            and clause._execution_options.get("replica")
+            and clause._for_update_arg is None
+            and not self._flushing
+            and not self.info.get(_USE_PRIMARY)
+            and not self.info.get(_WROTE)
+        ):
+            replica = self.replicas.choose()
+            if replica is not None:
+                self.info[_REPLICA] = replica
+                return replica.engine.sync_engine
+        elif not isinstance(clause, Select):
+            self.info[_WROTE] = True
+        self.info.pop(_REPLICA, None)
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def use_primary(db: Union[Session, AsyncSession]) -> None:
+    """Serve every later read of ``db`` from the primary (read-your-writes)."""
+    db.info[_USE_PRIMARY] = True
+
+
+async def read_with_fallback(db: AsyncSession, read: Callable[[], Awaitable[T]]) -> T:
+    """Run ``read``; if the replica serving it fails, take that replica out of rotation
+    and run ``read`` once more on the primary, which serves the rest of ``db``."""
+    try:
+        return await read()
+    except DBAPIError as exc:
+        replica = db.info.pop(_REPLICA, None)
+        if replica is None:
+            raise
+        replica.mark_down(f"{type(exc.orig).__name__}: {exc.orig}")
+    await db.rollback()
+    use_primary(db)
+    return await read()
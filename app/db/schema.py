@@ -0,0 +1,95 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import Column, DateTime, Index, Integer, Table, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from app.db.base import Base
+
+# Bump whenever the models gain tables, columns or indexes, so that fast
+# startups run create_tables() once more on the new release.
+SCHEMA_VERSION = 3
+
+# Indexes superseded by another one: each is dropped once its replacement is valid
+RETIRED_INDEXES: Dict[str, str] = {
+    "ix_users_email_lower": "uq_users_email_lower",
+    "ix_users_username_lower": "uq_users_username_lower",
+}
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime, default=datetime.utcnow, nullable=False),
+)
+
+
+def stamp_schema_version(connection: Connection) -> None:
+    current = connection.scalar(select(func.max(schema_version.c.version)))
+    if current is None or current < SCHEMA_VERSION:
+        connection.execute(insert(schema_version).values(version=SCHEMA_VERSION))
+
+
+async def schema_is_current(engine: AsyncEngine) -> bool:
+    """One query instead of create_all's catalog inspection; False if never stamped."""
+    try:
+        async with engine.connect() as connection:
+            current = await connection.scalar(select(func.max(schema_version.c.version)))
+    except DBAPIError:
+        # schema_version doesn't exist yet
+        return False
+    return current is not None and current >= SCHEMA_VERSION
+
+
+def is_online_index(index: Index) -> bool:
+    """Whether Postgres builds ``index`` with CREATE INDEX CONCURRENTLY, which on a big
+    table takes minutes: only ``python -m app.cli migrate`` does that, not startups."""
+    return bool(index.dialect_options["postgresql"]["concurrently"])
+
+
+def index_is_valid(connection: Connection, index: Index) -> Optional[bool]:
+    """``None`` when ``index`` doesn't exist; ``False`` when a failed concurrent build
+    left it INVALID, so Postgres keeps it updated but never uses it."""
+    valid: Optional[bool] = connection.scalar(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": index.name},
+    )
+    return valid
+
+
+def build_online_index(connection: Connection, index: Index) -> bool:
+    """Build ``index`` concurrently, first dropping an INVALID leftover of a failed build.
+
+    Returns False when a unique ``index`` can't be built because existing rows
+    collide; its failed build is dropped. ``connection`` must be in autocommit and
+    have no ``statement_timeout``.
+    """
+    valid = index_is_valid(connection, index)
+    if valid:
+        return True
+    if valid is False:
+        logger.warning("Index %s is INVALID (failed build); rebuilding it", index.name)
+        connection.execute(DropIndex(index, if_exists=True))
+    logger.info("Building index %s", index.name)
+    try:
+        connection.execute(CreateIndex(index))
+    except IntegrityError:
+        logger.warning("Index %s not built: existing rows violate it", index.name)
+        connection.execute(DropIndex(index, if_exists=True))
+        return False
+    return True
+
+
+def drop_retired_indexes(connection: Connection, valid: Iterable[str], online: bool) -> None:
+    """Drop the ``RETIRED_INDEXES`` whose replacement is among ``valid``."""
+    valid = set(valid)
+    concurrently = "CONCURRENTLY " if online else ""
+    for retired, replacement in RETIRED_INDEXES.items():
+        if replacement in valid:
+            connection.execute(text(f"DROP INDEX {concurrently}IF EXISTS {retired}"))
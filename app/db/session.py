@@ -1,30 +1,100 @@
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.pool import NullPool
+import logging
+from typing import List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 from app.db.base import Base
+from app.db.lazy import LazySession, session_usage
+from app.db.pool import engine_options, install_statement_timeout, resolve_pool_profile
+from app.db.schema import (
+    build_online_index,
+    drop_retired_indexes,
+    index_is_valid,
+    is_online_index,
+    stamp_schema_version,
+)
+
+logger = logging.getLogger(__name__)
 
-use_nullpool = os.getenv("DB_USE_NULLPOOL", "true").lower() == "true" or \
-    ("supabase.com" in settings.DATABASE_URL and ":6543" in settings.DATABASE_URL)
+pool_profile = resolve_pool_profile(settings.DATABASE_URL)
 
-if use_nullpool:
-    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool, pool_pre_ping=True, echo=settings.DEBUG)
-else:
-    engine = create_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+engine = create_engine(
+    settings.DATABASE_URL,
+    **engine_options(make_url(settings.DATABASE_URL), pool_profile, is_async=False),
+)
+install_statement_timeout(engine, pool_profile)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def get_db():
-    db = SessionLocal()
+    db = LazySession(SessionLocal)
     try:
         yield db
     finally:
-        db.close()
+        if db.started:
+            db.session.close()
+        session_usage.record(db.started)
+
 
+def create_tables(build_online_indexes: bool = False) -> List[str]:
+    """Create missing tables and indexes; returns the online indexes still missing.
 
-def create_tables():
+    On Postgres, startups only check the indexes of ``is_online_index``: ``python -m
+    app.cli migrate`` builds them (``build_online_indexes``), without the statement
+    timeout, and rebuilds those a failed build left INVALID. SCHEMA_VERSION is only
+    stamped once none is missing, so fast startups keep checking until then. A unique
+    index that existing rows violate is reported missing too; the index it replaces
+    (``RETIRED_INDEXES``) is only dropped once it is built.
+    """
     import app.src.auth.models  # noqa: F401
 
-    Base.metadata.create_all(bind=engine)
+    # Autocommit: Postgres can't CREATE INDEX CONCURRENTLY inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        online = connection.dialect.name == "postgresql"
+        # Under pgbouncer the server connection is shared: its role's timeout applies
+        unlimited = online and build_online_indexes and pool_profile != "pgbouncer"
+        if unlimited:
+            connection.execute(text("SET statement_timeout = 0"))
+
+        Base.metadata.create_all(bind=connection)
+        missing = []
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if not (online and is_online_index(index)):
+                    # create_all skips tables that already exist, including indexes added
+                    # to them later. IF NOT EXISTS: reflection doesn't see expression
+                    # indexes on every dialect.
+                    try:
+                        connection.execute(CreateIndex(index, if_not_exists=True))
+                    except IntegrityError:
+                        logger.warning("Index %s not built: existing rows violate it", index.name)
+                        missing.append(str(index.name))
+                elif build_online_indexes:
+                    if not build_online_index(connection, index):
+                        missing.append(str(index.name))
+                elif not index_is_valid(connection, index):
+                    missing.append(str(index.name))
+        if build_online_indexes or not online:
+            built = {
+                str(index.name) for table in Base.metadata.sorted_tables for index in table.indexes
+            }
+            drop_retired_indexes(connection, built - set(missing), online)
+
+        if missing:
+            logger.warning(
+                "Indexes %s are missing or invalid; run `python -m app.cli migrate`",
+                ", ".join(missing),
+            )
+        else:
+            stamp_schema_version(connection)
+        if unlimited:
+            # Don't hand a connection without statement_timeout back to the pool
+            connection.invalidate()
+    return missing
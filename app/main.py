@@ -1,11 +1,45 @@
-from fastapi import FastAPI
+import secrets
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
 from app.core.config import settings
-from app.db.session import create_tables
+from app.core.metrics import MetricsMiddleware
+from app.core.startup import startup_mode, startup_report
+from app.db.async_session import AsyncSessionLocal, async_engine, replica_set, to_async_url
+from app.db.pool import PoolCollector, warm_up
+from app.db.schema import schema_is_current
+from app.db.session import create_tables, engine, pool_profile
+from app.src.auth.invalidation import InvalidationListener
+from app.src.auth.middleware import AuthMiddleware
+from app.src.auth.ratelimit import LoginThrottled
+from app.src.auth.repository import AsyncRevokedTokenRepository
+from app.src.auth.revocation import DenylistSynchronizer, denylist
 from app.src.auth.router import router as auth_router
+from app.src.auth.router import well_known_router
+from app.src.auth.security import HashingQueueFull, hashing_engine
 
 app = FastAPI(title=settings.PROJECT_NAME)
+denylist_sync = DenylistSynchronizer(
+    denylist,
+    AsyncSessionLocal,
+    AsyncRevokedTokenRepository(),
+    interval=settings.REVOCATION_REFRESH_SECONDS,
+)
+invalidation_listener: InvalidationListener | None = None
+if settings.CACHE_INVALIDATION_ENABLED and (
+    settings.CACHE_INVALIDATION_URL or pool_profile != "pgbouncer"
+):
+    invalidation_listener = InvalidationListener(
+        to_async_url(settings.CACHE_INVALIDATION_URL or settings.DATABASE_URL)
+    )
+
+if settings.AUTH_MIDDLEWARE_ENABLED:
+    app.add_middleware(AuthMiddleware)
 
 # CORS
 app.add_middleware(
@@ -14,16 +48,105 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "ETag", "Last-Modified"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register(
+        PoolCollector(
+            {
+                "async": async_engine,
+                "sync": engine,
+                **{replica.name: replica.engine for replica in replica_set.replicas},
+            }
+        )
+    )
+
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}")
+app.include_router(well_known_router)
+
+
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Servidor ocupado, tente novamente em instantes"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(LoginThrottled)
+async def login_throttled_handler(request: Request, exc: LoginThrottled):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Muitas tentativas de login, tente novamente mais tarde"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 @app.on_event("startup")
-def startup_event():
-    create_tables()
+async def startup_event():
+    fast = startup_mode() == "fast"
+
+    with startup_report.phase("schema"):
+        if not (fast and await schema_is_current(async_engine)):
+            await run_in_threadpool(create_tables)
+
+    if not fast:
+        with startup_report.phase("pool_warmup"):
+            await warm_up(async_engine, settings.DB_POOL_WARMUP)
+    elif settings.STARTUP_BACKGROUND_WARMUP:
+        startup_report.run_in_background(
+            "pool_warmup", warm_up(async_engine, settings.DB_POOL_WARMUP)
+        )
+        startup_report.run_in_background("hashing_warmup", hashing_engine.warm_up())
+
+    with startup_report.phase("denylist"):
+        await denylist_sync.start()
+    with startup_report.phase("replicas"):
+        await replica_set.start()
+    if invalidation_listener is not None:
+        await invalidation_listener.start()
+
+    startup_report.mark_ready()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    startup_report.cancel_background()
+    await denylist_sync.stop()
+    if invalidation_listener is not None:
+        await invalidation_listener.stop()
+    hashing_engine.shutdown()
+    await replica_set.stop()
+    await async_engine.dispose()
 
 
 @app.get("/")
 def health():
     return {"status": "ok"}
+
+
+def verify_metrics_key(authorization: Optional[str] = Header(None)) -> None:
+    expected_key = settings.METRICS_API_KEY
+    if not expected_key:
+        return
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {expected_key}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Chave de métricas inválida",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_key)])
+    def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+startup_report.mark_imported()
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.src.auth.models import User
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire ``ttl`` seconds after being stored.
+
+    ``set`` accepts a per-entry ``ttl`` for values that carry their own expiry. A
+    ``maxsize`` of 0 disables the cache: ``set`` becomes a no-op and every ``get``
+    is a miss.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class UserCache:
+    """Snapshots of ``users`` rows keyed by id, for the authentication dependencies.
+
+    Snapshots are stored as plain column dicts and handed out as fresh, transient
+    ``User`` instances, so callers can't mutate the cached copy or lazy-load through
+    a closed session.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, user_id: int) -> Optional[User]:
+        snapshot = self._cache.get(user_id)
+        if snapshot is None:
+            return None
+        return User(**snapshot)
+
+    def set(self, user: User) -> None:
+        snapshot = {column: getattr(user, column) for column in _USER_COLUMNS}
+        self._cache.set(int(user.id), snapshot)
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.pop(user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class PrimaryPins:
+    """Users who changed their own data less than ``ttl`` seconds ago.
+
+    Their requests read from the primary instead of a replica that may not have
+    replayed the change yet.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def pin(self, user_id: int) -> None:
+        self._cache.set(user_id, True)
+
+    def is_pinned(self, user_id: int) -> bool:
+        return self._cache.enabled and self._cache.get(user_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+# Only needed with read replicas; independent of the user cache being enabled
+primary_pins = PrimaryPins(
+    maxsize=settings.DB_REPLICA_STICKY_USERS if settings.DATABASE_REPLICA_URLS else 0,
+    ttl=settings.DB_REPLICA_STICKY_SECONDS,
+)
@@ -0,0 +1,241 @@
+import abc
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from app.src.auth.keys import ASYMMETRIC_ALGORITHMS
+
+if TYPE_CHECKING:
+    from app.src.auth.keys import KeyRing
+
+HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+# Raw ECDSA signature size (r || s) per JWS algorithm
+_EC_SIGNATURE_BYTES = {"ES256": 64, "ES384": 96, "ES512": 132}
+
+
+class UnsupportedCodecKey(Exception):
+    """Raised when a codec can't work with the configured algorithm or key objects."""
+
+
+class TokenCodec(abc.ABC):
+    """Turns claims into a signed compact JWS and back.
+
+    ``decode`` returns ``None`` for anything that isn't a valid, unexpired token
+    signed with one of our keys, instead of raising.
+    """
+
+    algorithm: str
+
+    @abc.abstractmethod
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """Sign ``claims`` into a compact JWS."""
+
+    @abc.abstractmethod
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """The verified claims of ``token``, or ``None``."""
+
+
+class JoseTokenCodec(TokenCodec):
+    """python-jose's generic implementation (handles every algorithm it supports)."""
+
+    def __init__(self, algorithm: str, secret: str, key_ring: Optional["KeyRing"] = None):
+        from jose import jwt
+
+        self.algorithm = algorithm
+        self._jwt = jwt
+        self._secret = secret
+        self._key_ring = key_ring
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        if self._key_ring is None:
+            token: str = self._jwt.encode(claims, self._secret, algorithm=self.algorithm)
+            return token
+
+        kid, private_key = self._key_ring.signing_key
+        token = self._jwt.encode(
+            claims, private_key, algorithm=self.algorithm, headers={"kid": kid}
+        )
+        return token
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            if self._key_ring is None:
+                key: Any = self._secret
+            else:
+                key = self._key_ring.verification_key(
+                    self._jwt.get_unverified_header(token).get("kid")
+                )
+                if key is None:
+                    return None
+            payload: Dict[str, Any] = self._jwt.decode(token, key, algorithms=[self.algorithm])
+        except self._jwt.JWTError:
+            return None
+        return payload
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _json_segment(data: Dict[str, Any]) -> str:
+    return _b64encode(json.dumps(data, separators=(",", ":")).encode())
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def claims_are_valid(claims: Dict[str, Any], now: float) -> bool:
+    """The registered-claim checks python-jose applies by default, without leeway."""
+    exp = claims.get("exp")
+    if exp is not None and (not _is_number(exp) or exp < now):
+        return False
+    nbf = claims.get("nbf")
+    if nbf is not None and (not _is_number(nbf) or nbf > now):
+        return False
+    if "iat" in claims and not _is_number(claims["iat"]):
+        return False
+    # No audience is configured, so (like jose) any token that names one is rejected
+    if "aud" in claims:
+        return False
+    if "sub" in claims and not isinstance(claims["sub"], str):
+        return False
+    return "jti" not in claims or isinstance(claims["jti"], str)
+
+
+class FastTokenCodec(TokenCodec):
+    """HS*/RS*/ES* tokens with everything that doesn't depend on the claims done once.
+
+    The header segment is serialized up front, the HMAC key schedule is
+    prepared once and copied per token, and asymmetric keys are used directly
+    as ``cryptography`` objects. Tokens carrying our own header skip header
+    parsing entirely on decode.
+    """
+
+    def __init__(self, algorithm: str, secret: str, key_ring: Optional["KeyRing"] = None):
+        self.algorithm = algorithm
+        header: Dict[str, Any] = {"alg": algorithm, "typ": "JWT"}
+
+        if algorithm in HMAC_ALGORITHMS:
+            self._mac = hmac.new(secret.encode(), digestmod=HMAC_ALGORITHMS[algorithm])
+            self._kid: Optional[str] = None
+            self._sign: Callable[[bytes], bytes] = self._sign_hmac
+            self._verify: Callable[[bytes, bytes, Optional[str]], bool] = self._verify_hmac
+        elif algorithm in ASYMMETRIC_ALGORITHMS and key_ring is not None:
+            self._prepare_asymmetric(algorithm, key_ring)
+            header["kid"] = self._kid
+        else:
+            raise UnsupportedCodecKey(f"FastTokenCodec does not support {algorithm}")
+
+        self._header_segment = _json_segment(header)
+
+    def _prepare_asymmetric(self, algorithm: str, key_ring: "KeyRing") -> None:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+        from cryptography.hazmat.primitives.asymmetric.utils import (
+            decode_dss_signature,
+            encode_dss_signature,
+        )
+
+        native_types = (
+            rsa.RSAPrivateKey,
+            rsa.RSAPublicKey,
+            ec.EllipticCurvePrivateKey,
+            ec.EllipticCurvePublicKey,
+        )
+
+        def prepared(key: Any) -> Any:
+            # python-jose's cryptography backend keeps the ``cryptography`` key here
+            native = getattr(key, "prepared_key", None)
+            if not isinstance(native, native_types):
+                raise UnsupportedCodecKey("Keys were not loaded with the cryptography backend")
+            return native
+
+        digest = {"256": hashes.SHA256, "384": hashes.SHA384, "512": hashes.SHA512}[algorithm[2:]]()
+        self._kid, signing_key = key_ring.signing_key
+        private_key = prepared(signing_key)
+        public_keys = {kid: prepared(key) for kid, key in key_ring.verification_keys.items()}
+
+        if algorithm.startswith("RS"):
+
+            def sign(data: bytes) -> bytes:
+                return bytes(private_key.sign(data, padding.PKCS1v15(), digest))
+
+            def verify(data: bytes, signature: bytes, kid: Optional[str]) -> bool:
+                public_key = public_keys.get(kid) if kid is not None else None
+                if public_key is None:
+                    return False
+                try:
+                    public_key.verify(signature, data, padding.PKCS1v15(), digest)
+                except InvalidSignature:
+                    return False
+                return True
+
+        else:
+            size = _EC_SIGNATURE_BYTES[algorithm] // 2
+            signature_algorithm = ec.ECDSA(digest)
+
+            def sign(data: bytes) -> bytes:
+                r, s = decode_dss_signature(private_key.sign(data, signature_algorithm))
+                return r.to_bytes(size, "big") + s.to_bytes(size, "big")
+
+            def verify(data: bytes, signature: bytes, kid: Optional[str]) -> bool:
+                public_key = public_keys.get(kid) if kid is not None else None
+                if public_key is None or len(signature) != 2 * size:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:size], "big"), int.from_bytes(signature[size:], "big")
+                )
+                try:
+                    public_key.verify(der, data, signature_algorithm)
+                except InvalidSignature:
+                    return False
+                return True
+
+        self._sign = sign
+        self._verify = verify
+
+    def _sign_hmac(self, data: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(data)
+        return mac.digest()
+
+    def _verify_hmac(self, data: bytes, signature: bytes, kid: Optional[str]) -> bool:
+        return hmac.compare_digest(self._sign_hmac(data), signature)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        signing_input = f"{self._header_segment}.{_json_segment(claims)}"
+        return f"{signing_input}.{_b64encode(self._sign(signing_input.encode('ascii')))}"
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        signing_input, _, signature_segment = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        if not payload_segment or "." in payload_segment:
+            return None
+
+        try:
+            if header_segment == self._header_segment:
+                kid = self._kid
+            else:
+                header = json.loads(_b64decode(header_segment))
+                if header.get("alg") != self.algorithm:
+                    return None
+                kid = header.get("kid")
+
+            if not self._verify(signing_input.encode("ascii"), _b64decode(signature_segment), kid):
+                return None
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+        if not isinstance(claims, dict) or not claims_are_valid(claims, time.time()):
+            return None
+        return claims
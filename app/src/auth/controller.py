@@ -1,71 +1,117 @@
-from datetime import timedelta
-from typing import List
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.config import settings
+from app.db.errors import unique_violation_column
+from app.db.pagination import InvalidCursor, Page
+from app.src.auth.cache import user_cache
+from app.src.auth.export import csv_header, encode_csv, encode_ndjson
+from app.src.auth.importer import UserImporter
 from app.src.auth.models import User
-from app.src.auth.repository import UserRepository
+from app.src.auth.ratelimit import login_throttle
+from app.src.auth.repository import AsyncRevokedTokenRepository, AsyncUserRepository
+from app.src.auth.revocation import denylist, from_epoch, user_revocation_id
 from app.src.auth.schemas import (
+    IntrospectionResponse,
     LoginRequest,
     PasswordChange,
     Token,
+    TokenIntrospection,
     UserCreate,
+    UserImportReport,
     UserResponse,
+    UserRow,
     UserUpdate,
+    to_user_row,
+    user_rows_adapter,
 )
-from app.src.auth.security import create_access_token, verify_password
+from app.src.auth.security import create_access_token, decode_access_token, hashing_engine
 
 
 class AuthController:
     """Controller para operações de autenticação"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.repository = UserRepository()
+        self.repository = AsyncUserRepository()
+        self.revoked_tokens = AsyncRevokedTokenRepository()
 
-    def register(self, user_in: UserCreate) -> UserResponse:
+    async def register(self, user_in: UserCreate) -> UserResponse:
         """
         Registrar novo usuário
         ... (same as original)
+
+        Email e username já usados são recusados pelos índices únicos no INSERT,
+        sem consulta prévia. Só quando o erro não indica a coluna, uma consulta
+        descobre qual delas já está em uso.
         """
-        constraints = self.repository.check_unique_constraints(
-            self.db, user_in.email, user_in.username
+        hashed_password = await hashing_engine.hash(user_in.password)
+        try:
+            user = await self.repository.create_user(self.db, user_in, hashed_password)
+        except IntegrityError as exc:
+            error = _unique_violation_error(exc) or await self._taken_error(user_in)
+            if error is None:
+                raise
+            raise error
+        return UserResponse.model_validate(user)
+
+    async def _taken_error(self, user_in: UserCreate) -> Optional[HTTPException]:
+        taken_emails, taken_usernames = await self.repository.find_taken(
+            self.db, {user_in.email}, {user_in.username}
+        )
+        if not (taken_emails or taken_usernames):
+            return None
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=UNIQUE_VIOLATION_MESSAGES["email" if taken_emails else "username"],
         )
 
-        if constraints["email_exists"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email já cadastrado no sistema",
-            )
+    async def login(self, login_data: LoginRequest, client_ip: str) -> Token:
+        """
+        Autenticar usuário.
 
-        if constraints["username_exists"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username já está em uso",
-            )
+        Senhas guardadas com outro algoritmo ou custo (``PASSWORD_SCHEMES``,
+        ``BCRYPT_ROUNDS``) são recalculadas no login bem-sucedido.
 
-        user = self.repository.create_user(self.db, user_in)
-        return UserResponse.model_validate(user)
+        Tentativas acima do limite (por IP ou por email/username) recebem 429 antes
+        da consulta ao banco e do bcrypt. Usuários inexistentes também passam por um
+        bcrypt, para que o tempo de resposta não revele quais contas existem.
+        """
+        await login_throttle.check(client_ip, login_data.username)
 
-    def login(self, login_data: LoginRequest) -> Token:
-        user = self.repository.get_by_email_or_username(self.db, login_data.username)
+        user = await self.repository.get_by_email_or_username(self.db, login_data.username)
 
         if not user:
+            await hashing_engine.verify_dummy(login_data.password)
+            await login_throttle.record_failure(login_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Credenciais inválidas",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        if not verify_password(login_data.password, str(user.hashed_password)):
+        old_hash = str(user.hashed_password)
+        valid, new_hash = await hashing_engine.verify_and_update(login_data.password, old_hash)
+        if not valid:
+            await login_throttle.record_failure(login_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Credenciais inválidas",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        await login_throttle.record_success(login_data.username)
+        if new_hash is not None:
+            # Hash com outro algoritmo ou custo: atualiza para o configurado, a menos que a
+            # senha tenha sido trocada enquanto este login verificava a antiga
+            await self.repository.rehash_password(self.db, user, old_hash, new_hash)
+
         if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -80,76 +126,236 @@ class AuthController:
 
         return Token(access_token=access_token, token_type="bearer")
 
-    def get_me(self, current_user: User) -> UserResponse:
-        return UserResponse.model_validate(current_user)
-
-    def update_me(self, current_user: User, user_update: UserUpdate) -> UserResponse:
-        if user_update.email and user_update.email != current_user.email:
-            existing_user = self.repository.get_by_email(self.db, user_update.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email já cadastrado no sistema",
-                )
-
-        if user_update.username and user_update.username != current_user.username:
-            existing_user = self.repository.get_by_username(self.db, user_update.username)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username já está em uso",
-                )
-
-        updated_user = self.repository.update(self.db, int(current_user.id), user_update)
+    async def get_me(self, current_user: User) -> UserRow:
+        return to_user_row(current_user)
+
+    async def update_me(self, current_user: User, user_update: UserUpdate) -> UserResponse:
+        try:
+            updated_user = await self.repository.update(self.db, int(current_user.id), user_update)
+        except IntegrityError as exc:
+            error = _unique_violation_error(exc)
+            if error is None:
+                raise
+            raise error
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado",
+            )
         return UserResponse.model_validate(updated_user)
 
-    def change_password(self, current_user: User, password_change: PasswordChange) -> dict:
-        if not verify_password(password_change.current_password, str(current_user.hashed_password)):
+    async def change_password(self, current_user: User, password_change: PasswordChange) -> dict:
+        """
+        Alterar a senha do usuário logado.
+
+        Todos os tokens do usuário emitidos até a troca, inclusive o usado nesta
+        requisição, deixam de ser aceitos.
+        """
+        if not await hashing_engine.verify(
+            password_change.current_password, str(current_user.hashed_password)
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Senha atual incorreta",
             )
 
-        self.repository.update_password(self.db, current_user, password_change.new_password)
+        hashed_password = await hashing_engine.hash(password_change.new_password)
+        await self.repository.set_password_hash(self.db, current_user, hashed_password)
+        await self.revoke_user_tokens(int(current_user.id))
 
         return {"message": "Senha alterada com sucesso"}
 
-    def logout(self, current_user: User) -> dict:
+    async def logout(self, current_user: User, token_payload: dict) -> dict:
         """
         Logout do usuário.
 
-        Nota: Como usamos JWT stateless, o token continua válido até expirar.
-        O cliente deve descartar o token localmente.
-        Este endpoint serve para logs/auditoria.
+        O ``jti`` do token é gravado em ``revoked_tokens`` e na denylist em memória,
+        então o token deixa de ser aceito mesmo antes de expirar.
         """
         # Aqui você pode adicionar logs de auditoria se necessário
         # logger.info(f"User {current_user.username} (ID: {current_user.id}) logged out")
+        await self.revoke_token(token_payload)
 
         return {
             "message": "Logout realizado com sucesso",
-            "detail": "Token será invalidado pelo cliente"
+            "detail": "Token revogado",
         }
 
-    def get_all_users(self, skip: int = 0, limit: int = 100) -> List[UserResponse]:
-        users = self.repository.get_multi(self.db, skip=skip, limit=limit)
-        return [UserResponse.model_validate(user) for user in users]
+    async def revoke_user_tokens(self, user_id: int) -> None:
+        # Tokens emitidos antes deste instante expiram no máximo
+        # ACCESS_TOKEN_EXPIRE_MINUTES depois; a revogação dura o mesmo tempo
+        issued_before = time.time()
+        expires_at = issued_before + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        jti = user_revocation_id(user_id, issued_before)
+        await self.revoked_tokens.add(self.db, jti, user_id, from_epoch(expires_at))
+        denylist.add(jti, expires_at)
 
-    def get_user_by_id(self, user_id: int) -> UserResponse:
-        user = self.repository.get(self.db, user_id)
-        if not user:
+    async def revoke_token(self, token_payload: dict) -> None:
+        jti = token_payload.get("jti")
+        exp = token_payload.get("exp")
+        if jti is None or not isinstance(exp, (int, float)):
+            # Tokens emitidos antes do suporte a jti expiram naturalmente
+            return
+
+        await self.revoked_tokens.add(
+            self.db, str(jti), _subject_id(token_payload), from_epoch(exp)
+        )
+        denylist.add(str(jti), exp)
+
+    async def introspect(self, tokens: List[str]) -> IntrospectionResponse:
+        """
+        Valida um lote de tokens de uma vez (uso pelo API gateway).
+
+        Os usuários referenciados são resolvidos pelo cache e, para o restante,
+        por uma única consulta ``IN``.
+        """
+        payloads = [decode_access_token(token) for token in tokens]
+        user_ids = {_subject_id(payload) for payload in payloads} - {None}
+
+        users: Dict[int, User] = {}
+        missing_ids = []
+        for user_id in user_ids:
+            cached_user = user_cache.get(user_id)
+            if cached_user is None:
+                missing_ids.append(user_id)
+            else:
+                users[user_id] = cached_user
+
+        if missing_ids:
+            for user in await self.repository.get_many(self.db, missing_ids):
+                user_cache.set(user)
+                users[int(user.id)] = user
+
+        results = []
+        for payload in payloads:
+            user_id = _subject_id(payload)
+            user = users.get(user_id) if user_id is not None else None
+            if payload is None or user is None or not user.is_active:
+                results.append(TokenIntrospection(active=False))
+            else:
+                results.append(TokenIntrospection(active=True, claims=payload))
+
+        return IntrospectionResponse(results=results)
+
+    async def get_all_users(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        is_active: Optional[bool] = None,
+        is_superuser: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> Page[UserRow]:
+        try:
+            page = await self.repository.list_users(
+                self.db,
+                cursor=cursor,
+                limit=limit,
+                is_active=is_active,
+                is_superuser=is_superuser,
+                created_after=_naive_utc(created_after),
+                created_before=_naive_utc(created_before),
+            )
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido",
+            )
+
+        return Page(
+            user_rows_adapter.validate_python([row._asdict() for row in page.items]),
+            page.next_cursor,
+            page.prev_cursor,
+        )
+
+    async def export_users(
+        self,
+        sessions: async_sessionmaker[AsyncSession],
+        fmt: str,
+        updated_since: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Exportar usuários em NDJSON ou CSV, um bloco por vez
+
+        A leitura usa um cursor do lado do servidor numa sessão própria, aberta
+        com ``sessions``, que continua aberta enquanto a resposta é transmitida.
+        """
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        if fmt == "csv":
+            yield csv_header()
+
+        async with sessions() as db:
+            async for rows in self.repository.stream_export_rows(
+                db,
+                updated_since=_naive_utc(updated_since),
+                chunk_size=settings.EXPORT_CHUNK_SIZE,
+            ):
+                yield encode(rows)
+
+    async def import_users(self, rows: List[Dict[str, Any]]) -> UserImportReport:
+        """
+        Importar usuários em lote
+
+        Linhas inválidas ou já cadastradas são reportadas individualmente, sem
+        impedir a criação das demais.
+        """
+        return await UserImporter(self.repository).run(self.db, rows)
+
+    async def get_user_by_id(self, user_id: int) -> Row:
+        """
+        Buscar usuário por ID, como linha com ``updated_at``
+
+        A validação e a serialização ficam para quem responde, que pode pular as
+        duas quando o cliente já tem a versão atual (304).
+        """
+        row = await self.repository.get_row(self.db, user_id)
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário não encontrado",
             )
-        return UserResponse.model_validate(user)
+        return row
 
-    def delete_user(self, user_id: int) -> dict:
-        user = self.repository.get(self.db, user_id)
+    async def delete_user(self, user_id: int) -> dict:
+        user = await self.repository.get(self.db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário não encontrado",
             )
 
-        self.repository.remove(self.db, user_id)
+        await self.repository.remove(self.db, user_id)
         return {"message": "Usuário deletado com sucesso"}
+
+
+UNIQUE_VIOLATION_MESSAGES = {
+    "email": "Email já cadastrado no sistema",
+    "username": "Username já está em uso",
+}
+
+
+def _unique_violation_error(exc: IntegrityError) -> Optional[HTTPException]:
+    """400 for a violated email/username index; ``None`` for any other integrity error."""
+    column = unique_violation_column(exc, "users", UNIQUE_VIOLATION_MESSAGES)
+    if column is None:
+        return None
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=UNIQUE_VIOLATION_MESSAGES[column],
+    )
+
+
+def _subject_id(payload: Optional[dict]) -> Optional[int]:
+    if payload is None:
+        return None
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # users.created_at is stored as naive UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,39 +1,74 @@
+import secrets
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.async_session import get_async_db
+from app.db.replicas import read_with_fallback, use_primary
+from app.src.auth.cache import primary_pins, user_cache
 from app.src.auth.models import User
-from app.src.auth.repository import UserRepository
+from app.src.auth.repository import AsyncUserRepository
 from app.src.auth.security import decode_access_token
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token = credentials.credentials
-    payload = decode_access_token(token)
 
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    if primary_pins.is_pinned(user_id):
+        # The user just changed their data; replicas may not have it yet
+        use_primary(db)
+
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    # A replica failing mid-read costs a retry on the primary, not a 500
+    user = await read_with_fallback(db, lambda: AsyncUserRepository().get(db, user_id))
+    if user is not None:
+        user_cache.set(user)
+    return user
+
+
+def _verified_payload(request: Request, token: str) -> Optional[dict]:
+    # AuthMiddleware, when installed, has already verified this same token
+    payload: Optional[dict] = request.scope.get("state", {}).get("token_payload")
+    if payload is not None:
+        return payload
+    return decode_access_token(token)
+
+
+async def get_token_payload(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict:
+    payload = _verified_payload(request, credentials.credentials)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return payload
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    credentials_exception = _credentials_exception()
 
     user_id: Optional[int] = payload.get("sub")
     if user_id is None:
         raise credentials_exception
 
-    user_repo = UserRepository()
-    user = user_repo.get(db, int(user_id))
+    user = await _load_user(db, int(user_id))
 
     if user is None:
         raise credentials_exception
@@ -63,15 +98,15 @@ async def get_current_superuser(
     return current_user
 
 
-def get_optional_current_user(
+async def get_optional_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Optional[User]:
     if credentials is None:
         return None
 
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = _verified_payload(request, credentials.credentials)
 
     if payload is None:
         return None
@@ -80,10 +115,26 @@ def get_optional_current_user(
     if user_id is None:
         return None
 
-    user_repo = UserRepository()
-    user = user_repo.get(db, int(user_id))
+    user = await _load_user(db, int(user_id))
 
     if user is None or not user.is_active:
         return None
 
     return user
+
+
+async def verify_introspection_key(
+    x_introspection_key: Optional[str] = Header(None),
+) -> None:
+    expected_key = settings.INTROSPECTION_API_KEY
+    if not expected_key:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Introspecção desabilitada: configure INTROSPECTION_API_KEY",
+        )
+
+    if x_introspection_key is None or not secrets.compare_digest(x_introspection_key, expected_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Chave de introspecção inválida",
+        )
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Row
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+EXPORT_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "full_name",
+    "is_active",
+    "is_superuser",
+    "created_at",
+    "updated_at",
+)
+
+
+# Spreadsheets evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return _cell(value)
+
+
+def encode_ndjson(rows: Iterable[Row]) -> bytes:
+    lines = (
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_cell, row))), ensure_ascii=False) for row in rows
+    )
+    return "".join(f"{line}\n" for line in lines).encode()
+
+
+def encode_csv(rows: Iterable[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_csv_cell(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def csv_header() -> bytes:
+    return encode_csv([EXPORT_FIELDS])
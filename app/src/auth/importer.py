@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.src.auth.models import User
+from app.src.auth.repository import AsyncUserRepository
+from app.src.auth.schemas import UserCreate, UserImportReport, UserImportResult
+from app.src.auth.security import hashing_engine
+
+# asyncpg binds at most 32767 parameters per statement: one per column and row
+MAX_BATCH_SIZE = 32767 // len(User.__table__.columns)
+
+
+def _failure(index: int, error: str) -> UserImportResult:
+    return UserImportResult(index=index, success=False, error=error)
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+class UserImporter:
+    """Creates users in bulk, reporting success or failure for every input row.
+
+    Each batch of ``batch_size`` rows costs one uniqueness query, one password
+    hashing fan-out across the hashing workers and one multi-row INSERT, committed
+    on its own; no transaction stays open while passwords are hashed. ``batch_size``
+    is capped at ``MAX_BATCH_SIZE``.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[AsyncUserRepository] = None,
+        batch_size: int = settings.IMPORT_BATCH_SIZE,
+    ):
+        self.repository = repository or AsyncUserRepository()
+        self.batch_size = min(max(batch_size, 1), MAX_BATCH_SIZE)
+
+    async def run(self, db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> UserImportReport:
+        results: List[Optional[UserImportResult]] = [None] * len(rows)
+        pending: List[Tuple[int, UserCreate]] = []
+        seen_emails = set()
+        seen_usernames = set()
+
+        for index, row in enumerate(rows):
+            try:
+                user_in = UserCreate.model_validate(row)
+            except ValidationError as exc:
+                results[index] = _failure(index, _describe(exc))
+                continue
+
+            # Like the unique lower() indexes, ignore case
+            email, username = user_in.email.lower(), user_in.username.lower()
+            if email in seen_emails:
+                results[index] = _failure(index, "Email repetido na importação")
+            elif username in seen_usernames:
+                results[index] = _failure(index, "Username repetido na importação")
+            else:
+                seen_emails.add(email)
+                seen_usernames.add(username)
+                pending.append((index, user_in))
+
+        for start in range(0, len(pending), self.batch_size):
+            await self._import_batch(db, pending[start : start + self.batch_size], results)
+
+        final = [result for result in results if result is not None]
+        created = sum(result.success for result in final)
+        return UserImportReport(created=created, failed=len(final) - created, results=final)
+
+    async def _import_batch(
+        self,
+        db: AsyncSession,
+        batch: List[Tuple[int, UserCreate]],
+        results: List[Optional[UserImportResult]],
+    ) -> None:
+        taken_emails, taken_usernames = await self.repository.find_taken(
+            db, {user_in.email for _, user_in in batch}, {user_in.username for _, user_in in batch}
+        )
+
+        accepted = []
+        for index, user_in in batch:
+            if user_in.email in taken_emails:
+                results[index] = _failure(index, "Email já cadastrado no sistema")
+            elif user_in.username in taken_usernames:
+                results[index] = _failure(index, "Username já está em uso")
+            else:
+                accepted.append((index, user_in))
+        # End the read transaction: hashing takes far longer than the INSERT, and a
+        # concurrent insert of the same email is skipped by bulk_insert anyway
+        await db.commit()
+        if not accepted:
+            return
+
+        hashes = await hashing_engine.hash_many([user_in.password for _, user_in in accepted])
+        inserted = await self.repository.bulk_insert(
+            db,
+            [
+                {**user_in.model_dump(exclude={"password"}), "hashed_password": hashed}
+                for (_, user_in), hashed in zip(accepted, hashes)
+            ],
+        )
+
+        for index, user_in in accepted:
+            user_id = inserted.get(user_in.email)
+            if user_id is None:
+                results[index] = _failure(index, "Email ou username já cadastrado no sistema")
+            else:
+                results[index] = UserImportResult(index=index, success=True, id=user_id)
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Any, List, Optional, Union
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.src.auth.cache import primary_pins, user_cache
+from app.src.auth.revocation import denylist
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "auth_invalidation"
+USER = "user"
+REVOKED = "revoked"
+NOTIFY_DIALECTS = {"postgresql"}
+
+_PENDING = "pending_invalidations"
+
+
+def publish(db: Union[Session, AsyncSession], kind: str, key: Any) -> None:
+    """Queue a ``<kind>:<key>`` event, sent with ``NOTIFY`` as part of the next COMMIT.
+
+    Postgres only delivers notifications of committed transactions, so listeners
+    never evict for a change that was rolled back.
+    """
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info.setdefault(_PENDING, []).append(f"{kind}:{key}")
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_pending(session: Session) -> None:
+    pending: Optional[List[str]] = session.info.pop(_PENDING, None)
+    if not pending or session.get_bind().dialect.name not in NOTIFY_DIALECTS:
+        return
+    for payload in dict.fromkeys(pending):
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": payload},
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def apply(payload: str) -> None:
+    """Evict what one event refers to from this worker's caches."""
+    kind, _, key = payload.partition(":")
+    try:
+        if kind == USER:
+            user_cache.invalidate(int(key))
+            primary_pins.pin(int(key))
+        elif kind == REVOKED:
+            jti, _, expires_at = key.rpartition(":")
+            denylist.add(jti, float(expires_at))
+        else:
+            logger.warning("Unknown invalidation event %r", payload)
+    except ValueError:
+        logger.warning("Malformed invalidation event %r", payload)
+
+
+class InvalidationListener:
+    """``LISTEN``s on a dedicated connection and applies every event to local caches.
+
+    Events sent while the connection was down are lost, so each (re)connect clears
+    the user cache; the denylist also catches up through its own polling. Needs
+    Postgres with asyncpg and a session-mode connection: ``LISTEN`` doesn't work
+    through a transaction-mode pooler such as pgbouncer on Supabase's :6543.
+    """
+
+    def __init__(self, url: URL, reconnect_delay: float = 5.0):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def supported(self) -> bool:
+        return self.url.drivername == "postgresql+asyncpg"
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        apply(payload)
+
+    async def _listen_once(self) -> None:
+        assert self._engine is not None
+        async with self._engine.connect() as connection:
+            raw = (await connection.get_raw_connection()).driver_connection
+            closed = asyncio.Event()
+            raw.add_termination_listener(lambda _: closed.set())
+            await raw.add_listener(CHANNEL, self._on_notify)
+            user_cache.clear()
+            logger.info("Listening for cache invalidations on '%s'", CHANNEL)
+            await closed.wait()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+                logger.warning("Cache invalidation connection closed; reconnecting")
+            except Exception:
+                logger.warning("Cache invalidation listener failed; retrying", exc_info=True)
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        if not self.supported:
+            logger.info("Cache invalidation bus needs postgresql+asyncpg; not listening")
+            return
+        self._engine = create_async_engine(self.url, poolclass=NullPool)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
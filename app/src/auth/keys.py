@@ -0,0 +1,90 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from jose.backends.base import Key
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class KeyRingError(Exception):
+    """Raised when the signing keys can't be loaded or are misconfigured."""
+
+
+class KeyRing:
+    """Asymmetric keys used to sign and verify access tokens, indexed by ``kid``.
+
+    Every key in the ring is accepted for verification and published in the JWKS;
+    only ``active_kid`` signs new tokens. Retiring a key means keeping its public
+    half around until the last token it signed has expired.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        private_keys: Dict[str, "Key"],
+        public_keys: Dict[str, "Key"],
+        active_kid: str,
+    ):
+        if active_kid not in private_keys:
+            raise KeyRingError(f"No private key found for active kid '{active_kid}'")
+
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self._private_keys = private_keys
+        self._public_keys = public_keys
+
+    @classmethod
+    def from_directory(
+        cls, path: str, algorithm: str, active_kid: Optional[str] = None
+    ) -> "KeyRing":
+        """Load ``<kid>.pem`` private keys and ``<kid>.pub.pem`` retired public keys.
+
+        Without ``active_kid``, the private key whose kid sorts last signs.
+        """
+        from jose import jwk
+
+        directory = Path(path)
+        if not directory.is_dir():
+            raise KeyRingError(f"JWT key directory '{path}' does not exist")
+
+        private_keys: Dict[str, "Key"] = {}
+        public_keys: Dict[str, "Key"] = {}
+        for key_file in sorted(directory.glob("*.pem")):
+            pem = key_file.read_text()
+            if key_file.name.endswith(".pub.pem"):
+                kid = key_file.name[: -len(".pub.pem")]
+                public_keys[kid] = jwk.construct(pem, algorithm)
+                continue
+
+            kid = key_file.name[: -len(".pem")]
+            if "PRIVATE KEY" not in pem:
+                raise KeyRingError(f"'{key_file.name}' is not a private key; name it {kid}.pub.pem")
+            private_keys[kid] = jwk.construct(pem, algorithm)
+            public_keys[kid] = private_keys[kid].public_key()
+
+        if not private_keys:
+            raise KeyRingError(f"No private keys found in '{path}'")
+
+        return cls(algorithm, private_keys, public_keys, active_kid or max(private_keys))
+
+    @property
+    def signing_key(self) -> Tuple[str, "Key"]:
+        return self.active_kid, self._private_keys[self.active_kid]
+
+    @property
+    def verification_keys(self) -> Dict[str, "Key"]:
+        return dict(self._public_keys)
+
+    def verification_key(self, kid: Optional[str]) -> Optional["Key"]:
+        if kid is None:
+            return None
+        return self._public_keys.get(kid)
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        keys = []
+        for kid, key in sorted(self._public_keys.items()):
+            jwk_dict = key.to_dict()
+            jwk_dict.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            keys.append(jwk_dict)
+        return {"keys": keys}
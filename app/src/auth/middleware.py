@@ -1,68 +1,105 @@
-from fastapi import Request, status
+from typing import Any, Awaitable, Callable, Iterable, MutableMapping, Optional
+
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.src.auth.security import decode_access_token
 
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    PUBLIC_ROUTES = [
-        "/",
-        "/health",
-        "/api/v1/docs",
-        "/api/v1/openapi.json",
-        "/api/v1/redoc",
-        "/api/v1/auth/register",
-        "/api/v1/auth/login",
-    ]
-
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        if self._is_public_route(path):
-            response = await call_next(request)
-            return response
-
-        auth_header = request.headers.get("Authorization")
-
-        if not auth_header:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token de autenticação é necessário"},
-            )
 
-        try:
-            scheme, token = auth_header.split()
-            if scheme.lower() != "bearer":
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Esquema de autenticação inválido. Use 'Bearer'"},
-                )
-        except ValueError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Formato do header Authorization inválido"},
+class AuthMiddleware:
+    """Rejects requests without a valid bearer token, outside the public routes.
+
+    Plain ASGI (no ``BaseHTTPMiddleware`` task and stream wrapping). The verified
+    claims are kept in ``scope["state"]["token_payload"]``, where
+    ``get_token_payload`` picks them up instead of decoding the token again.
+    """
+
+    PUBLIC_ROUTES = frozenset(
+        {
+            "/",
+            "/health",
+            "/.well-known/jwks.json",
+            "/metrics",
+            "/docs",
+            "/docs/oauth2-redirect",
+            "/openapi.json",
+            "/redoc",
+            "/api/v1/docs",
+            "/api/v1/openapi.json",
+            "/api/v1/redoc",
+            "/api/v1/auth/register",
+            "/api/v1/auth/login",
+            # Guarded by verify_introspection_key instead of a bearer token
+            "/api/v1/auth/introspect",
+        }
+    )
+    PUBLIC_PREFIXES = ("/uploads/", "/static/")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_routes: Optional[Iterable[str]] = None,
+        public_prefixes: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.public_routes = frozenset(public_routes or self.PUBLIC_ROUTES)
+        self.public_prefixes = tuple(public_prefixes or self.PUBLIC_PREFIXES)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._is_public_route(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        auth_header = _header(scope, b"authorization")
+        if auth_header is None:
+            await self._reject(scope, receive, send, "Token de autenticação é necessário")
+            return
+
+        parts = auth_header.split()
+        if len(parts) != 2:
+            await self._reject(scope, receive, send, "Formato do header Authorization inválido")
+            return
+
+        scheme, token = parts
+        if scheme.lower() != "bearer":
+            await self._reject(
+                scope, receive, send, "Esquema de autenticação inválido. Use 'Bearer'"
             )
+            return
 
         payload = decode_access_token(token)
         if payload is None:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token inválido ou expirado"},
-            )
+            await self._reject(scope, receive, send, "Token inválido ou expirado")
+            return
 
-        request.state.user_id = payload.get("sub")
-        request.state.username = payload.get("username")
+        state = scope.setdefault("state", {})
+        state["token_payload"] = payload
+        state["user_id"] = payload.get("sub")
+        state["username"] = payload.get("username")
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
     def _is_public_route(self, path: str) -> bool:
-        if path in self.PUBLIC_ROUTES:
-            return True
+        return path in self.public_routes or path.startswith(self.public_prefixes)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, detail: str) -> None:
+        response = JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": detail},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        await response(scope, receive, send)
 
-        public_prefixes = ["/uploads/", "/static/"]
-        for prefix in public_prefixes:
-            if path.startswith(prefix):
-                return True
 
-        return False
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return str(value.decode("latin-1"))
+    return None
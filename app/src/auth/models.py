@@ -1,12 +1,20 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, func
 
 from app.db.base import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination on /auth/users, optionally filtered by status flags
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_is_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_users_is_superuser_created_at_id", "is_superuser", "created_at", "id"),
+        # Incremental exports (updated_since)
+        Index("ix_users_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -20,3 +28,28 @@ class User(Base):
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, username={self.username})>"
+
+
+# Case-insensitive login lookups (lower(email) = lower(:identifier)), also keeping
+# accounts from differing only in case. On Postgres, `python -m app.cli migrate`
+# builds them without locking writes (see is_online_index); until existing rows
+# that collide ignoring case are fixed, they can't be built (see case_conflicts).
+Index("uq_users_email_lower", func.lower(User.email), unique=True, postgresql_concurrently=True)
+Index(
+    "uq_users_username_lower",
+    func.lower(User.username),
+    unique=True,
+    postgresql_concurrently=True,
+)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, user_id={self.user_id})>"
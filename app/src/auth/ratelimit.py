@@ -0,0 +1,312 @@
+import abc
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics import LOGIN_THROTTLED
+
+logger = logging.getLogger(__name__)
+
+Clock = Callable[[], float]
+
+
+class LoginThrottled(Exception):
+    """Raised before any database or bcrypt work when a login attempt is over its limit."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Too many login attempts ({scope})")
+        self.scope = scope
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class RateLimitBackend(abc.ABC):
+    """Counter store behind ``LoginThrottle``; keys expire on their own after ``ttl``."""
+
+    @abc.abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        """Current value of each of ``keys``, 0 for missing ones."""
+
+    @abc.abstractmethod
+    async def incr(self, key: str, ttl: float) -> int:
+        """Add one to ``key`` and (re)start its ``ttl``; returns the new value."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: int, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abc.abstractmethod
+    async def ttl(self, key: str) -> float:
+        """Seconds until ``key`` expires, 0 when it doesn't exist."""
+
+    @abc.abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Remove ``keys``; missing ones are ignored."""
+
+
+# Keys of LoginThrottle ("<prefix>:<kind>:<identifier>") that hold lockout state
+LOCKOUT_KINDS = frozenset({"lock", "strikes"})
+
+
+def _is_lockout_key(key: str) -> bool:
+    parts = key.split(":", 2)
+    return len(parts) == 3 and parts[1] in LOCKOUT_KINDS
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process counters. Each worker keeps its own, so limits are per worker.
+
+    Lockout keys are kept apart from the attempt counters, each side holding up
+    to ``maxsize`` keys: requests for many distinct identifiers only push out
+    other counters, never the locks already in place. Each table is kept in write
+    order, so eviction only looks at its oldest end: O(1) amortized under the lock.
+    """
+
+    def __init__(self, maxsize: int = 100000, clock: Clock = time.time):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._counters: OrderedDict[str, Tuple[int, float]] = OrderedDict()
+        self._lockouts: OrderedDict[str, Tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counters) + len(self._lockouts)
+
+    def _table(self, key: str) -> OrderedDict[str, Tuple[int, float]]:
+        return self._lockouts if _is_lockout_key(key) else self._counters
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[int, float]]:
+        table = self._table(key)
+        item = table.get(key)
+        if item is not None and item[1] <= now:
+            del table[key]
+            return None
+        return item
+
+    def _store(self, key: str, value: int, expires_at: float, now: float) -> None:
+        table = self._table(key)
+        table[key] = (value, expires_at)
+        table.move_to_end(key)
+        # Oldest writes first: with a table's windows alike, they also expire first
+        while table:
+            _, oldest_expires_at = next(iter(table.values()))
+            if oldest_expires_at > now and len(table) <= self.maxsize:
+                break
+            table.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        now = self.clock()
+        with self._lock:
+            return [item[0] if (item := self._live(key, now)) else 0 for key in keys]
+
+    async def incr(self, key: str, ttl: float) -> int:
+        now = self.clock()
+        with self._lock:
+            item = self._live(key, now)
+            value = (item[0] if item else 0) + 1
+            self._store(key, value, now + ttl, now)
+            return value
+
+    async def set(self, key: str, value: int, ttl: float) -> None:
+        now = self.clock()
+        with self._lock:
+            self._store(key, value, now + ttl, now)
+
+    async def ttl(self, key: str) -> float:
+        now = self.clock()
+        with self._lock:
+            item = self._live(key, now)
+            return item[1] - now if item else 0.0
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._table(key).pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._lockouts.clear()
+
+
+class RedisBackend(RateLimitBackend):
+    """Counters shared by every worker and instance, kept in Redis (needs ``redis``)."""
+
+    def __init__(self, url: str):
+        from redis import asyncio as aioredis
+
+        self._redis: Any = aioredis.from_url(url)
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        return [int(value or 0) for value in await self._redis.mget(list(keys))]
+
+    async def incr(self, key: str, ttl: float) -> int:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            value, _ = await pipe.incr(key).pexpire(key, int(ttl * 1000)).execute()
+        return int(value)
+
+    async def set(self, key: str, value: int, ttl: float) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def ttl(self, key: str) -> float:
+        remaining = await self._redis.pttl(key)
+        return max(remaining, 0) / 1000
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*keys)
+
+
+class LoginThrottle:
+    """Login attempt limits per client IP and per identifier (email or username).
+
+    Both use a sliding-window counter: the previous fixed window counts in
+    proportion to how much of it still overlaps the last ``window`` seconds.
+    ``ip_limit`` caps every attempt from an address; ``max_failures`` wrong
+    passwords for one identifier lock it for ``lockout`` seconds, doubling with
+    each lockout in the last day up to ``lockout_max``. A successful login clears
+    the identifier's failures and lockout history.
+
+    Backend errors are logged and the attempt is let through: losing the limiter
+    must not take logins down with it.
+    """
+
+    STRIKES_TTL = 86400
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        ip_limit: int,
+        ip_window: float,
+        max_failures: int,
+        failure_window: float,
+        lockout: float,
+        lockout_max: float,
+        enabled: bool = True,
+        clock: Clock = time.time,
+        prefix: str = "login",
+    ):
+        self.backend = backend
+        self.ip_limit = ip_limit
+        self.ip_window = ip_window
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        self.lockout = lockout
+        self.lockout_max = lockout_max
+        self.enabled = enabled
+        self.clock = clock
+        self.prefix = prefix
+
+    def _key(self, kind: str, value: str) -> str:
+        return f"{self.prefix}:{kind}:{value}"
+
+    def _window_keys(self, name: str, window: float, now: float) -> Tuple[str, str, float]:
+        index = int(now // window)
+        return f"{name}:{index}", f"{name}:{index - 1}", (now % window) / window
+
+    async def _window_count(self, name: str, window: float, now: float) -> float:
+        current, previous, elapsed = self._window_keys(name, window, now)
+        current_count, previous_count = await self.backend.get_many([current, previous])
+        return previous_count * (1 - elapsed) + current_count
+
+    async def check(self, ip: str, identifier: str) -> None:
+        """Count the attempt against ``ip``; raise ``LoginThrottled`` if it can't proceed."""
+        if not self.enabled:
+            return
+
+        now = self.clock()
+        ip_name = self._key("ip", ip)
+        try:
+            locked_for = await self.backend.ttl(self._key("lock", normalize(identifier)))
+            if locked_for <= 0:
+                if await self._window_count(ip_name, self.ip_window, now) < self.ip_limit:
+                    current, _, _ = self._window_keys(ip_name, self.ip_window, now)
+                    await self.backend.incr(current, ttl=2 * self.ip_window)
+                    return
+                scope, retry_after = "ip", self.ip_window - now % self.ip_window
+            else:
+                scope, retry_after = "identifier", locked_for
+        except Exception:
+            logger.warning("Login rate limiter unavailable; allowing attempt", exc_info=True)
+            return
+
+        LOGIN_THROTTLED.labels(scope).inc()
+        raise LoginThrottled(scope, retry_after)
+
+    async def record_failure(self, identifier: str) -> None:
+        if not self.enabled:
+            return
+
+        now = self.clock()
+        identifier = normalize(identifier)
+        name = self._key("fail", identifier)
+        current, previous, _ = self._window_keys(name, self.failure_window, now)
+        try:
+            await self.backend.incr(current, ttl=2 * self.failure_window)
+            if await self._window_count(name, self.failure_window, now) < self.max_failures:
+                return
+
+            strikes = await self.backend.incr(self._key("strikes", identifier), self.STRIKES_TTL)
+            duration = min(self.lockout * 2 ** (strikes - 1), self.lockout_max)
+            await self.backend.set(self._key("lock", identifier), 1, ttl=duration)
+            await self.backend.delete(current, previous)
+        except Exception:
+            logger.warning("Login rate limiter unavailable; failure not recorded", exc_info=True)
+
+    async def record_success(self, identifier: str) -> None:
+        if not self.enabled:
+            return
+
+        now = self.clock()
+        identifier = normalize(identifier)
+        current, previous, _ = self._window_keys(
+            self._key("fail", identifier), self.failure_window, now
+        )
+        try:
+            await self.backend.delete(current, previous, self._key("strikes", identifier))
+        except Exception:
+            logger.warning("Login rate limiter unavailable; failures not cleared", exc_info=True)
+
+
+def normalize(identifier: str) -> str:
+    return identifier.strip().lower()
+
+
+def client_ip(headers: Any, peer: Optional[str], trusted_hops: int) -> str:
+    """Client address, read from ``X-Forwarded-For`` when behind ``trusted_hops`` proxies.
+
+    Only the entries appended by our own proxies are trusted; anything further left
+    was written by the client and can be forged.
+    """
+    if trusted_hops > 0:
+        forwarded = [
+            part.strip() for part in headers.get("x-forwarded-for", "").split(",") if part.strip()
+        ]
+        if forwarded:
+            return forwarded[-min(trusted_hops, len(forwarded))]
+    return peer or "unknown"
+
+
+def build_backend(name: str) -> RateLimitBackend:
+    if name == "redis":
+        if not settings.LOGIN_RATE_LIMIT_REDIS_URL:
+            raise ValueError("LOGIN_RATE_LIMIT_REDIS_URL must be set for the redis backend")
+        return RedisBackend(settings.LOGIN_RATE_LIMIT_REDIS_URL)
+    if name != "memory":
+        raise ValueError("LOGIN_RATE_LIMIT_BACKEND must be 'memory' or 'redis'")
+    return MemoryBackend()
+
+
+login_throttle = LoginThrottle(
+    build_backend(settings.LOGIN_RATE_LIMIT_BACKEND.lower()),
+    ip_limit=settings.LOGIN_IP_MAX_ATTEMPTS,
+    ip_window=settings.LOGIN_IP_WINDOW_SECONDS,
+    max_failures=settings.LOGIN_MAX_FAILURES,
+    failure_window=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+    lockout=settings.LOGIN_LOCKOUT_SECONDS,
+    lockout_max=settings.LOGIN_LOCKOUT_MAX_SECONDS,
+    enabled=settings.LOGIN_RATE_LIMIT_ENABLED,
+)
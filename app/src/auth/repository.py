@@ -1,12 +1,62 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+from sqlalchemy import Row, Select, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.db.base_repository import BaseRepository
-from app.src.auth.models import User
-from app.src.auth.schemas import UserCreate, UserUpdate
+from app.db.base_repository import AsyncBaseRepository, BaseRepository
+from app.db.pagination import Page
+from app.db.replicas import REPLICA_READ
+from app.src.auth.cache import primary_pins, user_cache
+from app.src.auth.invalidation import REVOKED, USER, publish
+from app.src.auth.models import RevokedToken, User
+from app.src.auth.revocation import to_epoch
+from app.src.auth.schemas import USER_ROW_FIELDS, UserCreate, UserUpdate
 from app.src.auth.security import get_password_hash
 
+EXPORT_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.is_active,
+    User.is_superuser,
+    User.created_at,
+    User.updated_at,
+)
+
+# What UserResponse needs, selected as plain rows by the read endpoints
+RESPONSE_COLUMNS = tuple(getattr(User, name) for name in USER_ROW_FIELDS)
+
+
+def login_lookups(identifier: str) -> List[Select]:
+    """Queries for the user behind a login identifier, to run in order until one hits.
+
+    Each one matches ``lower(column) = lower(:identifier)`` on a single column, served
+    by that column's ``lower()`` index, where ``email = :x OR username = :x`` leaves
+    the planner combining two indexes. Only identifiers with an ``@`` are tried as
+    emails, then still as usernames, which may contain one. Uniqueness is still
+    exact, so when rows differ only in case the exact-case one wins, else the oldest.
+    """
+    columns = (User.email, User.username) if "@" in identifier else (User.username,)
+    return [
+        select(User)
+        .where(func.lower(column) == func.lower(identifier))
+        .order_by(column != identifier, User.id)
+        .limit(1)
+        for column in columns
+    ]
+
+
+def _user_changed(user_id: int) -> None:
+    # Other workers do the same when the change's NOTIFY reaches them
+    user_cache.invalidate(user_id)
+    primary_pins.pin(user_id)
+
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     def __init__(self):
@@ -19,15 +69,17 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         return db.query(User).filter(User.username == username).first()
 
     def get_by_email_or_username(self, db: Session, identifier: str) -> Optional[User]:
-        return (
-            db.query(User)
-            .filter((User.email == identifier) | (User.username == identifier))
-            .first()
-        )
+        for query in login_lookups(identifier):
+            user = db.execute(query).scalars().first()
+            if user is not None:
+                return user
+        return None
 
-    def create_user(self, db: Session, user_in: UserCreate) -> User:
+    def create_user(
+        self, db: Session, user_in: UserCreate, hashed_password: Optional[str] = None
+    ) -> User:
         user_data = user_in.model_dump(exclude={"password"})
-        user_data["hashed_password"] = get_password_hash(user_in.password)
+        user_data["hashed_password"] = hashed_password or get_password_hash(user_in.password)
 
         db_user = User(**user_data)
         db.add(db_user)
@@ -37,10 +89,14 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         return db_user
 
     def update_password(self, db: Session, user: User, new_password: str) -> User:
-        hashed_password: str = get_password_hash(new_password)
+        return self.set_password_hash(db, user, get_password_hash(new_password))
+
+    def set_password_hash(self, db: Session, user: User, hashed_password: str) -> User:
         user.hashed_password = hashed_password  # type: ignore[assignment]
+        publish(db, USER, user.id)
         db.commit()
         db.refresh(user)
+        _user_changed(int(user.id))
 
         return user
 
@@ -56,7 +112,248 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         db_obj = self.get(db, user_id)
         if db_obj is None:
             raise ValueError(f"User with id {user_id} not found")
-        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+        publish(db, USER, user_id)
+        updated_user = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        _user_changed(user_id)
+        return updated_user
 
     def remove(self, db: Session, user_id: int) -> User:
-        return self.delete(db, id=user_id)
+        publish(db, USER, user_id)
+        removed_user = self.delete(db, id=user_id)
+        _user_changed(user_id)
+        return removed_user
+
+
+class AsyncUserRepository(AsyncBaseRepository[User, UserCreate, UserUpdate]):
+    def __init__(self):
+        super().__init__(User)
+
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email == email).limit(1))
+        return result.scalars().first()
+
+    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.username == username).limit(1))
+        return result.scalars().first()
+
+    async def list_users(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        is_active: Optional[bool] = None,
+        is_superuser: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> Page[Row]:
+        """Keyset page of ``RESPONSE_COLUMNS`` rows (no ORM instances)."""
+        filters = []
+        if is_active is not None:
+            filters.append(User.is_active == is_active)
+        if is_superuser is not None:
+            filters.append(User.is_superuser == is_superuser)
+        if created_after is not None:
+            filters.append(User.created_at >= created_after)
+        if created_before is not None:
+            filters.append(User.created_at < created_before)
+        return await self.get_multi(
+            db, cursor=cursor, limit=limit, filters=filters, columns=RESPONSE_COLUMNS
+        )
+
+    async def get_row(self, db: AsyncSession, user_id: int) -> Optional[Row]:
+        """``RESPONSE_COLUMNS`` plus ``updated_at`` (the version) of one user, as a row."""
+        result = await db.execute(
+            select(*RESPONSE_COLUMNS, User.updated_at)
+            .where(User.id == user_id)
+            .execution_options(**REPLICA_READ)
+        )
+        return result.first()
+
+    async def stream_export_rows(
+        self,
+        db: AsyncSession,
+        *,
+        updated_since: Optional[datetime] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield ``EXPORT_COLUMNS`` rows in chunks read from a server-side cursor."""
+        query = select(*EXPORT_COLUMNS).order_by(User.id)
+        if updated_since is not None:
+            query = query.where(User.updated_at >= updated_since)
+
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions(chunk_size):
+            yield partition
+
+    async def get_many(self, db: AsyncSession, user_ids: Iterable[int]) -> List[User]:
+        result = await db.execute(select(User).where(User.id.in_(list(user_ids))))
+        return list(result.scalars().all())
+
+    async def get_by_email_or_username(self, db: AsyncSession, identifier: str) -> Optional[User]:
+        for query in login_lookups(identifier):
+            user = (await db.execute(query)).scalars().first()
+            if user is not None:
+                return user
+        return None
+
+    async def create_user(
+        self, db: AsyncSession, user_in: UserCreate, hashed_password: Optional[str] = None
+    ) -> User:
+        """Single ``INSERT ... RETURNING``; the unique indexes on email and username
+        do the duplicate checks, surfacing as ``IntegrityError``."""
+        user_data = user_in.model_dump(exclude={"password"})
+        user_data["hashed_password"] = hashed_password or get_password_hash(user_in.password)
+
+        try:
+            result = await db.execute(insert(User).values(**user_data).returning(User))
+            db_user = result.scalar_one()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise
+
+        return db_user
+
+    async def find_taken(
+        self, db: AsyncSession, emails: Set[str], usernames: Set[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Which of ``emails`` and ``usernames`` already belong to someone, ignoring case.
+
+        One query, served by the lower() indexes; returns the values as given.
+        """
+        lowered_emails = {email.lower() for email in emails}
+        lowered_usernames = {username.lower() for username in usernames}
+        result = await db.execute(
+            select(func.lower(User.email), func.lower(User.username)).where(
+                or_(
+                    func.lower(User.email).in_(lowered_emails),
+                    func.lower(User.username).in_(lowered_usernames),
+                )
+            )
+        )
+        found_emails: Set[str] = set()
+        found_usernames: Set[str] = set()
+        for email, username in result:
+            found_emails.add(email)
+            found_usernames.add(username)
+        return (
+            {email for email in emails if email.lower() in found_emails},
+            {username for username in usernames if username.lower() in found_usernames},
+        )
+
+    async def case_conflicts(self, db: AsyncSession) -> Dict[str, List[str]]:
+        """Emails and usernames (lowercased) that several users share once case is ignored."""
+        conflicts: Dict[str, List[str]] = {}
+        for name, column in (("email", User.email), ("username", User.username)):
+            lowered = func.lower(column)
+            result = await db.execute(select(lowered).group_by(lowered).having(func.count() > 1))
+            conflicts[name] = list(result.scalars().all())
+        return conflicts
+
+    async def bulk_insert(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insert ``rows`` in a single multi-row INSERT and return ``{email: id}``.
+
+        On PostgreSQL and SQLite, rows that hit a unique constraint (a concurrent
+        insert since the caller checked) are skipped and left out of the result.
+        """
+        now = datetime.utcnow()
+        values = [
+            {"is_active": True, "is_superuser": False, "created_at": now, "updated_at": now, **row}
+            for row in rows
+        ]
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt: Any = postgresql.insert(User).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(User).on_conflict_do_nothing()
+        else:
+            stmt = insert(User)
+
+        result = await db.execute(stmt.values(values).returning(User.id, User.email))
+        inserted = {email: user_id for user_id, email in result}
+        await db.commit()
+        return inserted
+
+    async def set_password_hash(self, db: AsyncSession, user: User, hashed_password: str) -> User:
+        # ``user`` may be a detached snapshot from the user cache, so write by id
+        await db.execute(
+            update(User).where(User.id == user.id).values(hashed_password=hashed_password)
+        )
+        publish(db, USER, user.id)
+        await db.commit()
+        set_committed_value(user, "hashed_password", hashed_password)
+        _user_changed(int(user.id))
+
+        return user
+
+    async def rehash_password(
+        self, db: AsyncSession, user: User, old_hash: str, new_hash: str
+    ) -> bool:
+        """Swap ``old_hash`` for ``new_hash``, unless the password changed since ``old_hash``
+        was read (compare-and-set). Returns whether the row was updated."""
+        result = await db.execute(
+            update(User)
+            .where(User.id == user.id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        if result.rowcount == 0:
+            # Nothing written; commit rather than roll back, which would expire ``user``
+            await db.commit()
+            return False
+        publish(db, USER, user.id)
+        await db.commit()
+        set_committed_value(user, "hashed_password", new_hash)
+        _user_changed(int(user.id))
+        return True
+
+    async def check_unique_constraints(self, db: AsyncSession, email: str, username: str) -> dict:
+        email_exists = await self.get_by_email(db, email) is not None
+        username_exists = await self.get_by_username(db, username) is not None
+
+        return {"email_exists": email_exists, "username_exists": username_exists}
+
+    async def update(
+        self, db: AsyncSession, user_id: int, obj_in: UserUpdate
+    ) -> User:  # type: ignore[override]
+        publish(db, USER, user_id)
+        try:
+            updated_user = await self.update_by_id(db, user_id, obj_in)
+        except IntegrityError:
+            await db.rollback()
+            raise
+        if updated_user is None:
+            raise ValueError(f"User with id {user_id} not found")
+        _user_changed(user_id)
+        return updated_user
+
+    async def remove(self, db: AsyncSession, user_id: int) -> User:
+        publish(db, USER, user_id)
+        removed_user = await self.delete(db, id=user_id)
+        _user_changed(user_id)
+        return removed_user
+
+
+class AsyncRevokedTokenRepository:
+    async def add(
+        self, db: AsyncSession, jti: str, user_id: Optional[int], expires_at: datetime
+    ) -> RevokedToken:
+        revoked = RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at)
+        db.add(revoked)
+        publish(db, REVOKED, f"{jti}:{to_epoch(expires_at)}")
+        await db.commit()
+        return revoked
+
+    async def list_active(
+        self, db: AsyncSession, revoked_since: Optional[datetime] = None
+    ) -> List[RevokedToken]:
+        query = select(RevokedToken).where(RevokedToken.expires_at > datetime.utcnow())
+        if revoked_since is not None:
+            query = query.where(RevokedToken.revoked_at > revoked_since)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def purge_expired(self, db: AsyncSession) -> None:
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+        await db.commit()
@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.src.auth.repository import AsyncRevokedTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (double hashing on a blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+
+USER_REVOCATION_PREFIX = "user:"
+
+
+def user_revocation_id(user_id: int, issued_before: float) -> str:
+    """Id under which "every token of ``user_id`` issued before this instant" is revoked."""
+    return f"{USER_REVOCATION_PREFIX}{user_id}:{issued_before!r}"
+
+
+def _parse_user_revocation(jti: str) -> Optional[Tuple[str, float]]:
+    if not jti.startswith(USER_REVOCATION_PREFIX):
+        return None
+    user_id, _, issued_before = jti[len(USER_REVOCATION_PREFIX) :].partition(":")
+    try:
+        return user_id, float(issued_before)
+    except ValueError:
+        return None
+
+
+class Denylist:
+    """Revoked token ids, each kept only until the token's own ``exp``.
+
+    Lookups for tokens that were never revoked (nearly all of them) are answered
+    by the bloom filter alone; hits are confirmed against the exact map.
+
+    Ids made by ``user_revocation_id`` revoke all of a user's tokens whose ``iat``
+    is older than the given instant (or that have no ``iat``); they are kept
+    apart, by user, until ``expires_at``.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._entries: Dict[str, float] = {}
+        self._users: Dict[str, Tuple[float, float]] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._users)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+
+        user_revocation = _parse_user_revocation(jti)
+        with self._lock:
+            if user_revocation is not None:
+                user_id, issued_before = user_revocation
+                previous_before, previous_expiry = self._users.get(user_id, (0.0, 0.0))
+                self._users[user_id] = (
+                    max(issued_before, previous_before),
+                    max(expires_at, previous_expiry),
+                )
+                return
+            self._entries[jti] = expires_at
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def is_user_revoked(self, user_id: str, issued_at: Optional[float]) -> bool:
+        """Whether a token of ``user_id`` issued at ``issued_at`` predates a revocation."""
+        if not self._users:
+            return False
+        revocation = self._users.get(user_id)
+        if revocation is None:
+            return False
+        issued_before, expires_at = revocation
+        return expires_at > time.time() and (issued_at is None or issued_at < issued_before)
+
+    def prune(self) -> int:
+        """Drop expired entries and rebuild the bloom filter from what's left."""
+        now = time.time()
+        with self._lock:
+            expired_users = [
+                user_id for user_id, (_, expires_at) in self._users.items() if expires_at <= now
+            ]
+            for user_id in expired_users:
+                del self._users[user_id]
+
+            expired = [jti for jti, expires_at in self._entries.items() if expires_at <= now]
+            if not expired:
+                return len(expired_users)
+            for jti in expired:
+                del self._entries[jti]
+
+            bloom = BloomFilter(max(self.capacity, 2 * len(self._entries)), self.error_rate)
+            for jti in self._entries:
+                bloom.add(jti)
+            self._bloom = bloom
+
+        return len(expired) + len(expired_users)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._users.clear()
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "users": len(self._users),
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hash_count,
+        }
+
+
+def to_epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+
+
+class DenylistSynchronizer:
+    """Keeps a worker's ``Denylist`` in line with the ``revoked_tokens`` table.
+
+    Everything still unexpired is loaded at startup. After that, the synchronizer
+    polls every ``interval`` seconds for rows revoked since the last poll, with a
+    small overlap so rows committed slightly out of order aren't missed.
+    """
+
+    def __init__(
+        self,
+        denylist: Denylist,
+        session_factory: Callable[[], "AsyncSession"],
+        repository: "AsyncRevokedTokenRepository",
+        interval: float,
+    ):
+        self.denylist = denylist
+        self.session_factory = session_factory
+        self.repository = repository
+        self.interval = interval
+        self._watermark: Optional[datetime] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def load(self) -> None:
+        async with self.session_factory() as db:
+            await self.repository.purge_expired(db)
+            await self._pull(db, since=None)
+
+    async def refresh(self) -> None:
+        since = None
+        if self._watermark is not None:
+            since = self._watermark - timedelta(seconds=max(self.interval, 1) * 2)
+
+        async with self.session_factory() as db:
+            await self._pull(db, since=since)
+            if self.denylist.prune():
+                await self.repository.purge_expired(db)
+
+    async def _pull(self, db: "AsyncSession", since: Optional[datetime]) -> None:
+        for revoked in await self.repository.list_active(db, revoked_since=since):
+            self.denylist.add(str(revoked.jti), to_epoch(revoked.expires_at))
+            if self._watermark is None or revoked.revoked_at > self._watermark:
+                self._watermark = revoked.revoked_at
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the token denylist")
+
+    async def start(self) -> None:
+        await self.load()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+denylist = Denylist(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY, error_rate=settings.REVOCATION_BLOOM_ERROR_RATE
+)
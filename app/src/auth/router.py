@@ -1,99 +1,264 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.db.session import get_db
+from app.core.conditional import conditional_response, entity_tag
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.core.startup import startup_report
+from app.db.async_session import (
+    async_engine,
+    get_async_db,
+    get_async_session_factory,
+    replica_set,
+)
+from app.db.lazy import session_usage
+from app.db.pool import pool_stats
+from app.db.session import pool_profile
+from app.src.auth.cache import user_cache
 from app.src.auth.controller import AuthController
-from app.src.auth.dependencies import get_current_active_user, get_current_superuser
+from app.src.auth.dependencies import (
+    get_current_active_user,
+    get_current_superuser,
+    get_token_payload,
+    verify_introspection_key,
+)
+from app.src.auth.export import EXPORT_MEDIA_TYPES
 from app.src.auth.models import User
+from app.src.auth.ratelimit import client_ip
+from app.src.auth.revocation import denylist
 from app.src.auth.schemas import (
+    IntrospectionRequest,
+    IntrospectionResponse,
     LoginRequest,
     PasswordChange,
     Token,
     UserCreate,
+    UserImportReport,
+    UserImportRequest,
     UserResponse,
     UserUpdate,
+    to_user_row,
 )
+from app.src.auth.security import get_jwks, token_cache
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
+well_known_router = APIRouter(prefix="/.well-known", tags=["JWKS"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
     controller = AuthController(db)
-    return controller.register(user_in)
+    return await controller.register(user_in)
 
 
 @router.post("/login", response_model=Token)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(
+    login_data: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)
+):
     controller = AuthController(db)
-    return controller.login(login_data)
+    ip = client_ip(
+        request.headers,
+        request.client.host if request.client else None,
+        settings.TRUSTED_PROXY_HOPS,
+    )
+    return await controller.login(login_data, ip)
+
+
+def _user_response(request: Request, user: Any) -> Response:
+    return conditional_response(
+        request.headers,
+        entity_tag(user.id, user.updated_at),
+        user.updated_at,
+        lambda: ORJSONResponse(to_user_row(user)),
+        cache_control=settings.USER_CACHE_CONTROL,
+        vary="Authorization",
+    )
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_active_user)):
-    return UserResponse.model_validate(current_user)
+async def get_me(request: Request, current_user: User = Depends(get_current_active_user)):
+    """
+    Dados do usuário autenticado.
+
+    Responde com ``ETag`` e ``Last-Modified``; com ``If-None-Match`` (ou
+    ``If-Modified-Since``) da versão atual, devolve 304 sem corpo.
+    """
+    return _user_response(request, current_user)
 
 
 @router.put("/me", response_model=UserResponse)
-def update_me(
+async def update_me(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     controller = AuthController(db)
-    return controller.update_me(current_user, user_update)
+    return await controller.update_me(current_user, user_update)
 
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     password_change: PasswordChange,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     controller = AuthController(db)
-    return controller.change_password(current_user, password_change)
+    return await controller.change_password(current_user, password_change)
 
 
 @router.post("/logout")
-def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(
+    current_user: User = Depends(get_current_active_user),
+    token_payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Logout do usuário.
 
-    O cliente deve descartar o token JWT após receber esta resposta.
-    Este endpoint é opcional e serve para logs/auditoria no backend.
+    O token usado na requisição é revogado e passa a ser recusado por todos os
+    workers (no máximo ``REVOCATION_REFRESH_SECONDS`` depois, nos demais).
     """
-    controller = AuthController(None)  # Não precisa de DB para logout simples
-    return controller.logout(current_user)
+    controller = AuthController(db)
+    return await controller.logout(current_user, token_payload)
+
+
+@router.post(
+    "/introspect",
+    response_model=IntrospectionResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(verify_introspection_key)],
+)
+async def introspect(
+    introspection_in: IntrospectionRequest, db: AsyncSession = Depends(get_async_db)
+):
+    controller = AuthController(db)
+    return await controller.introspect(introspection_in.tokens)
 
 
 @router.get("/users", response_model=List[UserResponse])
-def get_all_users(
-    skip: int = 0,
-    limit: int = 100,
+async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    is_active: Optional[bool] = None,
+    is_superuser: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
     current_user: User = Depends(get_current_superuser),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    """
+    Lista usuários por ordem de criação, com paginação por cursor.
+
+    Os cursores da próxima página e da anterior voltam nos headers
+    ``X-Next-Cursor`` e ``X-Prev-Cursor``, ausentes nas pontas.
+    """
     controller = AuthController(db)
-    return controller.get_all_users(skip=skip, limit=limit)
+    page = await controller.get_all_users(
+        cursor=cursor,
+        limit=limit,
+        is_active=is_active,
+        is_superuser=is_superuser,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    headers = {}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        headers["X-Prev-Cursor"] = page.prev_cursor
+    return ORJSONResponse(page.items, headers=headers)
+
+
+@router.get("/users/export")
+async def export_users(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_superuser),
+    db: AsyncSession = Depends(get_async_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+):
+    """
+    Exporta todos os usuários (ou só os alterados desde ``updated_since``).
+
+    A resposta é transmitida aos poucos, sem montar a lista inteira em memória.
+    """
+    controller = AuthController(db)
+    return StreamingResponse(
+        controller.export_users(sessions, fmt, updated_since),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+    )
+
+
+@router.post("/users/import", response_model=UserImportReport, response_model_exclude_none=True)
+async def import_users(
+    import_in: UserImportRequest,
+    current_user: User = Depends(get_current_superuser),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Cria usuários em lote (onboarding de imobiliárias).
+
+    Retorna o resultado de cada linha, na ordem enviada. Para arquivos CSV ou
+    JSON Lines, use ``python -m app.cli import-users``.
+    """
+    controller = AuthController(db)
+    return await controller.import_users(import_in.users)
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-def get_user_by_id(
+async def get_user_by_id(
     user_id: int,
+    request: Request,
     current_user: User = Depends(get_current_superuser),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     controller = AuthController(db)
-    return controller.get_user_by_id(user_id)
+    return _user_response(request, await controller.get_user_by_id(user_id))
 
 
 @router.delete("/users/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
     current_user: User = Depends(get_current_superuser),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     controller = AuthController(db)
-    return controller.delete_user(user_id)
+    return await controller.delete_user(user_id)
+
+
+@router.get("/admin/cache-stats")
+async def get_cache_stats(current_user: User = Depends(get_current_superuser)):
+    return {
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "denylist": denylist.stats(),
+    }
+
+
+@router.get("/admin/pool-stats")
+async def get_pool_stats(current_user: User = Depends(get_current_superuser)):
+    return {
+        "profile": pool_profile,
+        **pool_stats(async_engine.pool),
+        "sessions": session_usage.as_dict(),
+        "replicas": replica_set.stats(),
+    }
+
+
+@router.get("/admin/startup-report")
+async def get_startup_report(current_user: User = Depends(get_current_superuser)):
+    return startup_report.as_dict()
+
+
+@well_known_router.get("/jwks.json")
+async def get_jwks_document():
+    """Chaves públicas para validação local dos tokens por outros serviços."""
+    return JSONResponse(
+        content=get_jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"},
+    )
@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, field_validator
+from typing_extensions import TypedDict
+
+from app.core.config import settings
 
 
 class UserBase(BaseModel):
@@ -54,6 +57,34 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserRow(TypedDict):
+    """``UserResponse`` fields as read back from ``users``.
+
+    Values were validated on the way in, so only the types are checked here; the
+    email validator alone costs more than the rest of a listing row.
+    """
+
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+
+
+USER_ROW_FIELDS = tuple(UserRow.__annotations__)
+user_row_adapter = TypeAdapter(UserRow)
+user_rows_adapter = TypeAdapter(List[UserRow])
+
+
+def to_user_row(user: Any) -> UserRow:
+    """``UserRow`` from anything with the row's attributes (a ``User``, a result row)."""
+    return user_row_adapter.validate_python(
+        {field: getattr(user, field) for field in USER_ROW_FIELDS}
+    )
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -64,6 +95,37 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
+class IntrospectionRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=settings.INTROSPECTION_MAX_TOKENS)
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    claims: Optional[Dict[str, Any]] = None
+
+
+class IntrospectionResponse(BaseModel):
+    results: List[TokenIntrospection]
+
+
+class UserImportRequest(BaseModel):
+    # Rows are validated one by one so a bad row doesn't reject the whole batch
+    users: List[Dict[str, Any]] = Field(..., min_length=1, max_length=settings.IMPORT_MAX_ROWS)
+
+
+class UserImportResult(BaseModel):
+    index: int
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class UserImportReport(BaseModel):
+    created: int
+    failed: int
+    results: List[UserImportResult]
+
+
 class LoginRequest(BaseModel):
     username: str = Field(..., description="Username ou email do usuário")
     password: str = Field(..., min_length=6)
@@ -1,39 +1,354 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import hashlib
+import logging
+import math
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
 
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import (
+    JWT_SECONDS,
+    PASSWORD_HASHING_QUEUE_SECONDS,
+    PASSWORD_HASHING_SECONDS,
+)
+from app.src.auth.cache import TTLCache
+from app.src.auth.codec import FastTokenCodec, JoseTokenCodec, TokenCodec, UnsupportedCodecKey
+from app.src.auth.keys import ASYMMETRIC_ALGORITHMS, KeyRing, KeyRingError
+from app.src.auth.revocation import denylist
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+
+def build_password_context(
+    schemes: str, bcrypt_rounds: int, argon2_time_cost: int, argon2_memory_cost: int
+) -> CryptContext:
+    """Hashes new passwords with the first of ``schemes`` at exactly the configured cost.
+
+    Hashes in any other scheme, or at any other cost, are reported by ``needs_update``
+    and upgraded on the next successful login. ``argon2`` needs ``argon2-cffi``.
+    """
+    return CryptContext(
+        schemes=[scheme.strip().lower() for scheme in schemes.split(",") if scheme.strip()],
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+    )
+
+
+pwd_context = build_password_context(
+    settings.PASSWORD_SCHEMES,
+    settings.BCRYPT_ROUNDS,
+    settings.ARGON2_TIME_COST,
+    settings.ARGON2_MEMORY_COST,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """``(valid, new_hash)``; ``new_hash`` is set when the stored hash is outdated."""
+    valid, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    return bool(valid), new_hash
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)  # type: ignore[no-any-return]
 
 
+def calibrate_bcrypt_rounds(
+    target_seconds: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 3
+) -> Dict[str, Any]:
+    """Highest bcrypt cost whose verify takes at most ``target_seconds`` on this host.
+
+    Each extra round doubles the work, so a cheap measurement at cost 8 gives the
+    estimate, which is then measured and moved up or down until it fits.
+    """
+    from passlib.hash import bcrypt
+
+    timings: Dict[int, float] = {}
+
+    def measure(rounds: int) -> float:
+        hashed = bcrypt.using(rounds=rounds).hash("calibration")
+        durations = []
+        for _ in range(samples):
+            started_at = time.perf_counter()
+            bcrypt.verify("calibration", hashed)
+            durations.append(time.perf_counter() - started_at)
+        timings[rounds] = statistics.median(durations)
+        return timings[rounds]
+
+    baseline = measure(8)
+    estimate = 8 + math.floor(math.log2(target_seconds / baseline))
+    rounds = min(max(estimate, min_rounds), max_rounds)
+    measure(rounds)
+    while timings[rounds] > target_seconds and rounds > min_rounds:
+        rounds -= 1
+        measure(rounds)
+    while rounds < max_rounds and measure(rounds + 1) <= target_seconds:
+        rounds += 1
+
+    return {
+        "rounds": rounds,
+        "verify_ms": round(timings[rounds] * 1000, 2),
+        "target_ms": round(target_seconds * 1000, 2),
+        "measured_ms": {
+            cost: round(seconds * 1000, 2) for cost, seconds in sorted(timings.items())
+        },
+    }
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    # Runs inside the hashing worker, so the duration excludes queueing and IPC
+    started_at = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started_at
+
+
+# How long a batch job waits for room when interactive hashing fills the queue
+BATCH_RETRY_SECONDS = 0.05
+
+
+class HashingQueueFull(Exception):
+    """Raised when the hashing engine already has ``max_pending`` jobs in flight."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHashingEngine:
+    """Runs bcrypt off the event loop, in a process pool sized by ``HASH_WORKERS``.
+
+    Jobs beyond ``max_pending`` are rejected right away with ``HashingQueueFull``
+    instead of queueing, so a login storm can't build an unbounded backlog.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._dummy_hash: Optional[str] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _submit(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            raise HashingQueueFull(self.retry_after)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            started_at = time.perf_counter()
+            result, busy = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+            PASSWORD_HASHING_SECONDS.labels(operation).observe(busy)
+            PASSWORD_HASHING_QUEUE_SECONDS.labels(operation).observe(
+                max(time.perf_counter() - started_at - busy, 0.0)
+            )
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool on the next call.
+            self._executor = None
+            raise
+        finally:
+            self._pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        result: bool = await self._submit(
+            "verify", verify_password, plain_password, hashed_password
+        )
+        return result
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        result: Tuple[bool, Optional[str]] = await self._submit(
+            "verify", verify_and_update_password, plain_password, hashed_password
+        )
+        return result
+
+    async def verify_dummy(self, plain_password: str) -> None:
+        """Spend a real verify's worth of bcrypt, so unknown users aren't answered faster."""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(uuid4().hex)
+        await self.verify(plain_password, self._dummy_hash)
+
+    async def hash(self, password: str) -> str:
+        result: str = await self._submit("hash", get_password_hash, password)
+        return result
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """Hash a batch one password per job, with at most ``workers - 1`` in flight.
+
+        Logins and registrations keep a worker free and are queued between the
+        batch's jobs, not behind the whole batch. Batch jobs count towards
+        ``max_pending`` too, and wait for room instead of failing.
+        """
+        in_flight = asyncio.Semaphore(max(min(self.workers - 1, self.max_pending // 2), 1))
+
+        async def hash_one(password: str) -> str:
+            async with in_flight:
+                while True:
+                    try:
+                        hashed: str = await self._submit("hash_many", get_password_hash, password)
+                        return hashed
+                    except HashingQueueFull:
+                        await asyncio.sleep(BATCH_RETRY_SECONDS)
+
+        return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
+    async def warm_up(self) -> None:
+        """Start every worker and load bcrypt in it, so the first logins don't pay for it."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        hashes = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, get_password_hash, uuid4().hex)
+                for _ in range(max(self.workers, 1))
+            )
+        )
+        self._dummy_hash = self._dummy_hash or hashes[0]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_engine = PasswordHashingEngine(
+    workers=settings.HASH_WORKERS,
+    max_pending=settings.HASH_MAX_PENDING,
+    retry_after=settings.HASH_RETRY_AFTER_SECONDS,
+)
+
+
+def uses_asymmetric_signing() -> bool:
+    return settings.ALGORITHM in ASYMMETRIC_ALGORITHMS
+
+
+@lru_cache(maxsize=1)
+def get_key_ring() -> KeyRing:
+    if not settings.JWT_KEYS_DIR:
+        raise KeyRingError(f"JWT_KEYS_DIR must be set to sign tokens with {settings.ALGORITHM}")
+    return KeyRing.from_directory(
+        settings.JWT_KEYS_DIR, settings.ALGORITHM, active_kid=settings.JWT_ACTIVE_KID
+    )
+
+
+def get_jwks() -> Dict[str, Any]:
+    """Public keys for local verification by other services; empty under HS256."""
+    if not uses_asymmetric_signing():
+        return {"keys": []}
+    return get_key_ring().jwks()
+
+
+@lru_cache(maxsize=4)
+def build_token_codec(
+    codec: str, algorithm: str, secret: str, key_ring: Optional[KeyRing]
+) -> TokenCodec:
+    """The ``codec`` implementation (``fast`` or ``jose``), cached per arguments.
+
+    ``fast`` falls back to python-jose for algorithms or keys it can't handle.
+    """
+    if codec == "fast":
+        try:
+            return FastTokenCodec(algorithm, secret, key_ring)
+        except UnsupportedCodecKey:
+            logger.warning("Fast JWT codec unavailable for %s; using python-jose", algorithm)
+    return JoseTokenCodec(algorithm, secret, key_ring)
+
+
+def get_token_codec() -> TokenCodec:
+    """The codec for the current settings (``JWT_CODEC``: ``fast`` or ``jose``)."""
+    key_ring = get_key_ring() if uses_asymmetric_signing() else None
+    return build_token_codec(
+        settings.JWT_CODEC.lower(), settings.ALGORITHM, settings.SECRET_KEY, key_ring
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
 
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
-    encoded_jwt: str = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    now = time.time()
+    # Sub-second ``iat``: a password change revokes exactly the tokens issued before it
+    to_encode["iat"] = now
+    to_encode["exp"] = int(now + expires_delta.total_seconds())
+    to_encode.setdefault("jti", uuid4().hex)
+    codec = get_token_codec()
+    started_at = time.perf_counter()
+    encoded_jwt = codec.encode(to_encode)
+    JWT_SECONDS.labels("encode").observe(time.perf_counter() - started_at)
 
     return encoded_jwt
 
 
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    try:
-        payload: dict = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+    cache_key = hashlib.sha256(token.encode()).digest() if token_cache.enabled else None
+    if cache_key is not None:
+        cached: Optional[dict] = token_cache.get(cache_key)
+        if cached is not None:
+            return None if is_token_revoked(cached) else dict(cached)
+
+    codec = get_token_codec()
+    started_at = time.perf_counter()
+    payload = codec.decode(token)
+    JWT_SECONDS.labels("decode").observe(time.perf_counter() - started_at)
+    if payload is None:
         return None
+
+    exp = payload.get("exp")
+    if cache_key is not None and isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(cache_key, dict(payload), ttl=remaining)
+
+    if is_token_revoked(payload):
+        return None
+    return payload
+
+
+def is_token_revoked(payload: dict) -> bool:
+    jti = payload.get("jti")
+    if jti is not None and denylist.is_revoked(str(jti)):
+        return True
+    sub = payload.get("sub")
+    iat = payload.get("iat")
+    return sub is not None and denylist.is_user_revoked(
+        str(sub), iat if isinstance(iat, (int, float)) else None
+    )
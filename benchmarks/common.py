@@ -0,0 +1,60 @@
+"""Shared helpers: latency summaries and the JSON report every benchmark emits."""
+
+import json
+import math
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def summarize(
+    name: str, samples: Sequence[float], elapsed: float, errors: int = 0, **extra: Any
+) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput for ``samples`` given in seconds."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    result: Dict[str, Any] = {
+        "name": name,
+        "count": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 4) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if count else 0.0,
+    }
+    result.update(extra)
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_report(
+    suite: str, results: List[Dict[str, Any]], output: Optional[str], **context: Any
+) -> None:
+    """Print the report as JSON, and also write it to ``output`` when given."""
+    report = {"suite": suite, "environment": environment(), **context, "results": results}
+    payload = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    sys.stdout.write(payload + "\n")
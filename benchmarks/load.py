@@ -0,0 +1,146 @@
+"""HTTP load harness for /auth/login, /auth/me and /auth/users.
+
+    python -m benchmarks.load [--scenario login me users] [--concurrency 16]
+                              [--duration 10] [--users 1000] [--base-url URL]
+
+Without ``--base-url`` the app runs in-process behind httpx's ASGI transport (no
+network, client and server share one event loop) against ``DATABASE_URL``, which
+should be seeded first with ``python -m benchmarks.seed``; login throttling is
+turned off there. Against ``--base-url``, start the server with
+``LOGIN_RATE_LIMIT_ENABLED=false``.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import summarize, write_report
+from benchmarks.seed import BENCH_PASSWORD
+
+API = "/api/v1/auth"
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, name: str, request: Request, concurrency: int, duration: float
+) -> Dict[str, Any]:
+    samples: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            try:
+                response = await request(client, n)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                samples.append(time.perf_counter() - started_at)
+            else:
+                errors += 1
+            n += concurrency
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(
+        name, samples, time.perf_counter() - started_at, errors=errors, concurrency=concurrency
+    )
+
+
+async def login_as(client: httpx.AsyncClient, username: str) -> Dict[str, str]:
+    response = await client.post(
+        f"{API}/login", json={"username": username, "password": BENCH_PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def build_scenarios(
+    client: httpx.AsyncClient, users: int, token_users: int
+) -> Dict[str, Request]:
+    admin = await login_as(client, "bench0")
+    sessions = [await login_as(client, f"bench{n}") for n in range(min(token_users, users))]
+    cursors: Dict[int, Optional[str]] = {}
+
+    async def login(client: httpx.AsyncClient, n: int) -> httpx.Response:
+        return await client.post(
+            f"{API}/login", json={"username": f"bench{n % users}", "password": BENCH_PASSWORD}
+        )
+
+    async def me(client: httpx.AsyncClient, n: int) -> httpx.Response:
+        return await client.get(f"{API}/me", headers=sessions[n % len(sessions)])
+
+    async def list_users(client: httpx.AsyncClient, n: int) -> httpx.Response:
+        # Each worker walks the listing page by page and starts over at the end
+        worker = n % 1024
+        params: Dict[str, Any] = {"limit": 100}
+        if cursors.get(worker):
+            params["cursor"] = cursors[worker]
+        response = await client.get(f"{API}/users", params=params, headers=admin)
+        cursors[worker] = response.headers.get("x-next-cursor")
+        return response
+
+    return {"login": login, "me": me, "users": list_users}
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    if args.base_url:
+        transport: Optional[httpx.AsyncBaseTransport] = None
+        base_url = args.base_url
+    else:
+        from app.main import app, shutdown_event, startup_event
+        from app.src.auth.ratelimit import login_throttle
+
+        # Every request comes from the same client address
+        login_throttle.enabled = False
+        await startup_event()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, limits=limits, timeout=30
+        ) as client:
+            scenarios = await build_scenarios(client, args.users, args.token_users)
+            return [
+                await run_scenario(client, name, scenarios[name], args.concurrency, args.duration)
+                for name in args.scenario
+            ]
+    finally:
+        if not args.base_url:
+            await shutdown_event()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario", nargs="+", choices=["login", "me", "users"], default=["login", "me", "users"]
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--users", type=int, default=1000, help="how many users were seeded")
+    parser.add_argument("--token-users", type=int, default=50, help="distinct users for /me")
+    parser.add_argument("--base-url", help="benchmark a running server instead of in-process")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    write_report(
+        "load",
+        results,
+        args.output,
+        target=args.base_url or "in-process",
+        concurrency=args.concurrency,
+        duration_s=args.duration,
+    )
+
+
+if __name__ == "__main__":
+    main()
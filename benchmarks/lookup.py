@@ -0,0 +1,160 @@
+"""Login lookups against the users seeded at ``DATABASE_URL``, with their query plans.
+
+    python -m benchmarks.lookup [--users 1000000] [--iterations 2000] [--output lookup.json]
+
+Every identifier shape (email, username, each in other casing, unknown email)
+runs the queries of ``login_lookups``, and each of those queries is checked
+with EXPLAIN (PostgreSQL) or EXPLAIN QUERY PLAN (SQLite): ``index_lookup`` is
+true when no query scans the table. The command exits with 1 otherwise. Rows
+are fetched from the table after the index, since login needs the password hash.
+``legacy_or`` times the previous ``email = :x OR username = :x`` query.
+
+Seed first with ``python -m benchmarks.seed --users N``; run ``ANALYZE users``
+on Postgres afterwards so the planner knows the table size. On Postgres, the
+command refuses to run (exit 1) while an index ``migrate`` builds is missing.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Select, or_, select, text
+from sqlalchemy.engine import Connection
+
+from app.db.schema import index_is_valid, is_online_index
+from app.src.auth.models import User
+from app.src.auth.repository import login_lookups
+from benchmarks.common import summarize, write_report
+
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+SHAPES: Dict[str, Callable[[int], str]] = {
+    "email": lambda n: f"bench{n}@example.com",
+    "username": lambda n: f"bench{n}",
+    "email[upper]": lambda n: f"BENCH{n}@EXAMPLE.COM",
+    "username[mixed]": lambda n: f"Bench{n}",
+    "email[unknown]": lambda n: f"nobody{n}@example.com",
+}
+
+
+def legacy_lookup(identifier: str) -> Select:
+    return select(User).where(or_(User.email == identifier, User.username == identifier)).limit(1)
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def explain(connection: Connection, query: Select) -> Dict[str, Any]:
+    """Indexes used by ``query`` and whether it scans a whole table."""
+    sql = str(query.compile(connection, compile_kwargs={"literal_binds": True}))
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = _plan_nodes(plan[0]["Plan"])
+        return {
+            "indexes": sorted({node["Index Name"] for node in nodes if "Index Name" in node}),
+            "table_scan": any(node["Node Type"] == "Seq Scan" for node in nodes),
+            "plan": [node["Node Type"] for node in nodes],
+        }
+    if dialect == "sqlite":
+        details = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        return {
+            "indexes": sorted({m.group(1) for d in details for m in _SQLITE_INDEX.finditer(d)}),
+            "table_scan": any(d.startswith("SCAN") and "INDEX" not in d for d in details),
+            "plan": details,
+        }
+    return {"indexes": [], "table_scan": None, "plan": f"EXPLAIN not supported on {dialect}"}
+
+
+def measure(
+    connection: Connection,
+    name: str,
+    identifier: Callable[[int], str],
+    lookups: Callable[[str], List[Select]],
+    users: int,
+    iterations: int,
+) -> Dict[str, Any]:
+    plans = [explain(connection, query) for query in lookups(identifier(0))]
+    samples: List[float] = []
+    started_at = time.perf_counter()
+    for i in range(iterations):
+        # Spread over the whole table instead of hitting the same pages
+        n = i * 7919 % users
+        call_started_at = time.perf_counter()
+        for query in lookups(identifier(n)):
+            if connection.execute(query).first() is not None:
+                break
+        samples.append(time.perf_counter() - call_started_at)
+    return summarize(
+        name,
+        samples,
+        time.perf_counter() - started_at,
+        queries=len(plans),
+        index_lookup=not any(plan["table_scan"] is not False for plan in plans),
+        plans=plans,
+    )
+
+
+def missing_indexes(connection: Connection) -> List[str]:
+    """Online indexes (see ``is_online_index``) missing or INVALID on Postgres."""
+    if connection.dialect.name != "postgresql":
+        return []
+    return [
+        str(index.name)
+        for index in User.__table__.indexes
+        if is_online_index(index) and not index_is_valid(connection, index)
+    ]
+
+
+def run(users: int, iterations: int) -> List[Dict[str, Any]]:
+    from app.db.session import engine
+
+    with engine.connect() as connection:
+        missing = missing_indexes(connection)
+        if missing:
+            sys.exit(
+                f"Indexes {', '.join(missing)} are missing; run `python -m app.cli migrate` "
+                "or re-seed with `python -m benchmarks.seed`"
+            )
+        results = [
+            measure(connection, name, identifier, login_lookups, users, iterations)
+            for name, identifier in SHAPES.items()
+        ]
+        results.append(
+            measure(
+                connection,
+                "legacy_or",
+                SHAPES["username"],
+                lambda identifier: [legacy_lookup(identifier)],
+                users,
+                iterations,
+            )
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="how many users were seeded")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.users, args.iterations)
+    write_report("lookup", results, args.output, users=args.users)
+    if not all(result["index_lookup"] for result in results if result["name"] in SHAPES):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Microbenchmarks for the token and password primitives.
+
+    python -m benchmarks.micro [--iterations 5000] [--output micro.json]
+
+The ``codec[...]`` entries compare the fast and python-jose JWT codecs directly
+for the configured ALGORITHM, without the token cache or metrics around them.
+``users_page[...]`` compares turning one listing page into JSON through
+``UserResponse`` models against the ``UserRow`` adapter plus orjson.
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.src.auth.models import User
+from app.src.auth.schemas import USER_ROW_FIELDS, UserResponse, user_rows_adapter
+from app.src.auth.security import (
+    build_token_codec,
+    create_access_token,
+    decode_access_token,
+    get_key_ring,
+    get_password_hash,
+    token_cache,
+    uses_asymmetric_signing,
+    verify_password,
+)
+from benchmarks.common import summarize, write_report
+
+
+def measure(name: str, fn: Callable[[], Any], iterations: int, **extra: Any) -> Dict[str, Any]:
+    fn()  # warm up imports, key parsing and caches
+    samples: List[float] = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        call_started_at = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - call_started_at)
+    return summarize(name, samples, time.perf_counter() - started_at, **extra)
+
+
+def _decode_uncached(token: str) -> Callable[[], Any]:
+    def run() -> Any:
+        token_cache.clear()
+        return decode_access_token(token)
+
+    return run
+
+
+def _users_page(size: int) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": n,
+            "email": f"bench{n}@example.com",
+            "username": f"bench{n}",
+            "full_name": f"Bench User {n}",
+            "is_active": True,
+            "is_superuser": False,
+            "created_at": now,
+        }
+        for n in range(size)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--bcrypt-iterations", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    claims = {"sub": "1", "username": "bench"}
+    token = create_access_token(claims)
+    hashed = get_password_hash("Senha123")
+
+    results = [
+        measure("create_access_token", lambda: create_access_token(claims), args.iterations),
+        measure("decode_access_token[cache_miss]", _decode_uncached(token), args.iterations),
+        measure(
+            "decode_access_token[cache_hit]", lambda: decode_access_token(token), args.iterations
+        ),
+        measure(
+            "verify_password",
+            lambda: verify_password("Senha123", hashed),
+            args.bcrypt_iterations,
+            bcrypt_rounds=int(hashed.split("$")[2]),
+        ),
+    ]
+    key_ring = get_key_ring() if uses_asymmetric_signing() else None
+    for name in ("jose", "fast"):
+        codec = build_token_codec(name, settings.ALGORITHM, settings.SECRET_KEY, key_ring)
+        encoded = codec.encode({**claims, "exp": int(time.time()) + 3600, "jti": "bench"})
+        results.append(
+            measure(f"codec[{name}].encode", lambda: codec.encode(claims), args.iterations)
+        )
+        results.append(
+            measure(f"codec[{name}].decode", lambda: codec.decode(encoded), args.iterations)
+        )
+
+    rows = _users_page(args.page_size)
+    users = [User(**row) for row in rows]
+    response_adapter = TypeAdapter(List[UserResponse])
+    results.append(
+        measure(
+            "users_page[models]",
+            lambda: response_adapter.dump_json(
+                [UserResponse.model_validate(user) for user in users]
+            ),
+            args.iterations // 10,
+            page_size=args.page_size,
+        )
+    )
+    results.append(
+        measure(
+            "users_page[rows]",
+            lambda: orjson.dumps(
+                user_rows_adapter.validate_python(
+                    [{field: row[field] for field in USER_ROW_FIELDS} for row in rows]
+                )
+            ),
+            args.iterations // 10,
+            page_size=args.page_size,
+        )
+    )
+
+    write_report("micro", results, args.output, algorithm=settings.ALGORITHM)
+
+
+if __name__ == "__main__":
+    main()
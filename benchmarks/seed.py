@@ -0,0 +1,122 @@
+"""Fill the database at ``DATABASE_URL`` with generated users.
+
+    python -m benchmarks.seed --users 100000 [--batch-size 10000] [--reset]
+
+Every user gets the password ``BENCH_PASSWORD``; it is hashed once and the hash
+reused, so seeding millions of rows is bound by the database, not bcrypt. User
+``bench0`` is a superuser. PostgreSQL via psycopg2 is loaded with COPY; other
+databases with batched multi-row INSERTs. The indexes ``python -m app.cli migrate``
+builds concurrently on Postgres are built the same way once the rows are in.
+"""
+
+import argparse
+import csv
+import io
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+
+from app.db.session import create_tables, engine
+from app.src.auth.models import User
+from app.src.auth.security import get_password_hash
+
+BENCH_PASSWORD = "Senha123"
+COLUMNS = (
+    "email",
+    "username",
+    "full_name",
+    "hashed_password",
+    "is_active",
+    "is_superuser",
+    "created_at",
+    "updated_at",
+)
+
+
+def generate_users(count: int, start: int, hashed_password: str) -> Iterator[Dict[str, Any]]:
+    epoch = datetime(2024, 1, 1)
+    for n in range(start, start + count):
+        created_at = epoch + timedelta(seconds=n)
+        yield {
+            "email": f"bench{n}@example.com",
+            "username": f"bench{n}",
+            "full_name": f"Bench User {n}",
+            "hashed_password": hashed_password,
+            # every 10th user inactive, so the status filters have work to do
+            "is_active": n % 10 != 9,
+            "is_superuser": n == 0,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def _copy_batch(engine: Engine, rows: List[Dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in COLUMNS])
+    buffer.seek(0)
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY users ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _insert_batch(engine: Engine, rows: List[Dict[str, Any]]) -> None:
+    with engine.begin() as connection:
+        connection.execute(insert(User), rows)
+
+
+def seed(users: int, batch_size: int, start: int = 0, reset: bool = False) -> Dict[str, Any]:
+    create_tables()
+    if reset:
+        with engine.begin() as connection:
+            connection.execute(delete(User))
+
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+    write_batch = _copy_batch if use_copy else _insert_batch
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    started_at = time.perf_counter()
+    batch: List[Dict[str, Any]] = []
+    for row in generate_users(users, start, hashed_password):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            write_batch(engine, batch)
+            batch = []
+    if batch:
+        write_batch(engine, batch)
+    elapsed = time.perf_counter() - started_at
+    # As `python -m app.cli migrate`: startups never build the login indexes on Postgres
+    create_tables(build_online_indexes=True)
+
+    return {
+        "users": users,
+        "method": "copy" if use_copy else "insert",
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(users / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--start", type=int, default=0, help="first user number (to append)")
+    parser.add_argument("--reset", action="store_true", help="delete existing users first")
+    args = parser.parse_args(argv)
+
+    print(seed(args.users, args.batch_size, start=args.start, reset=args.reset))
+
+
+if __name__ == "__main__":
+    main()
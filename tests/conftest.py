@@ -1,6 +1,59 @@
+import asyncio
+import os
 import sys
 from pathlib import Path
 
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
+
+# Modules that create engines and worker pools on import get local, in-process ones
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("HASH_WORKERS", "0")
+
+from app.db.base import Base  # noqa: E402
+from app.src.auth import models  # noqa: E402,F401
+
+
+async def _memory_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine
+
+
+@pytest.fixture
+def run_engines():
+    """``run_engines(scenario, databases=1)``: runs ``scenario(*engines)`` against fresh
+    in-memory SQLite databases with every table created, and returns its result."""
+    pytest.importorskip("aiosqlite")
+
+    def run(scenario, databases=1):
+        async def main():
+            engines = [await _memory_engine() for _ in range(databases)]
+            try:
+                return await scenario(*engines)
+            finally:
+                for engine in engines:
+                    await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def run_db(run_engines):
+    """``run_db(scenario)``: like ``run_engines``, with ``scenario(db)`` given a session."""
+
+    def run(scenario):
+        async def with_session(engine):
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await scenario(db)
+
+        return run_engines(with_session)
+
+    return run
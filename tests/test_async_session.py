@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.db import async_session
+from app.db.async_session import AsyncSessionLocal, async_engine, get_async_db, to_async_url
+from app.db.lazy import SessionUsage
+
+
+@pytest.mark.parametrize(
+    "database_url, expected",
+    [
+        ("postgres://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql+asyncpg://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("mysql+aiomysql://u:p@db/app", "mysql+aiomysql://u:p@db/app"),
+    ],
+)
+def test_sync_drivers_are_swapped_for_their_asyncio_counterparts(database_url, expected):
+    assert to_async_url(database_url).render_as_string(hide_password=False) == expected
+
+
+def test_sslmode_becomes_asyncpg_ssl_and_other_parameters_are_kept():
+    url = to_async_url("postgresql://u:p@db/app?sslmode=require&application_name=auth")
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert dict(url.query) == {"ssl": "require", "application_name": "auth"}
+    # Only asyncpg needs the rename
+    assert dict(to_async_url("sqlite:///app.db?sslmode=require").query) == {"sslmode": "require"}
+
+
+def test_session_factory_is_bound_to_the_async_engine():
+    session = AsyncSessionLocal()
+    try:
+        assert session.bind is async_engine
+        assert session.sync_session.expire_on_commit is False
+        assert session.sync_session.autoflush is False
+    finally:
+        asyncio.run(session.close())
+
+    assert async_engine.url.drivername == "sqlite+aiosqlite"
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    async def execute(self, statement):
+        return 1
+
+    async def close(self):
+        self.closed = True
+
+
+def _request(use_session):
+    """Drives ``get_async_db`` like FastAPI does for one request."""
+
+    async def request():
+        dependency = get_async_db()
+        db = await anext(dependency)
+        if use_session:
+            await db.execute(text("SELECT 1"))
+        with pytest.raises(StopAsyncIteration):
+            await anext(dependency)
+        return db
+
+    return asyncio.run(request())
+
+
+def test_get_async_db_only_opens_and_closes_a_session_when_used(monkeypatch):
+    sessions = []
+    usage = SessionUsage()
+
+    def factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(async_session, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(async_session, "session_usage", usage)
+
+    unused = _request(use_session=False)
+    assert unused.started is False
+    assert sessions == []
+
+    used = _request(use_session=True)
+    assert used.started is True
+    assert [session.closed for session in sessions] == [True]
+
+    assert usage.as_dict()["requests"] == 2
+    assert usage.as_dict()["used"] == 1
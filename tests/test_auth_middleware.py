@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.src.auth import middleware  # noqa: E402
+from app.src.auth.middleware import AuthMiddleware  # noqa: E402
+from app.src.auth.security import create_access_token  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+
+    @app.get("/")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/static/logo.png")
+    def logo():
+        return {"file": "logo"}
+
+    @app.get("/private")
+    def private(request: Request):
+        return request.scope["state"]["token_payload"]
+
+    return TestClient(app)
+
+
+def test_public_routes_skip_authentication(client):
+    assert client.get("/").status_code == 200
+    assert client.get("/static/logo.png").status_code == 200
+
+
+@pytest.mark.parametrize(
+    "headers, detail",
+    [
+        ({}, "Token de autenticação é necessário"),
+        ({"Authorization": "Basic abc"}, "Esquema de autenticação inválido. Use 'Bearer'"),
+        ({"Authorization": "Bearer"}, "Formato do header Authorization inválido"),
+        ({"Authorization": "Bearer abc"}, "Token inválido ou expirado"),
+    ],
+)
+def test_rejects_missing_or_invalid_tokens(client, headers, detail):
+    response = client.get("/private", headers=headers)
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": detail}
+
+
+def test_token_is_decoded_once_and_claims_kept_in_scope(client, monkeypatch):
+    token = create_access_token({"sub": "7", "username": "alice"})
+    calls = []
+    decode = middleware.decode_access_token
+    monkeypatch.setattr(middleware, "decode_access_token", lambda t: calls.append(t) or decode(t))
+
+    response = client.get("/private", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["sub"] == "7"
+    assert calls == [token]
@@ -0,0 +1,39 @@
+from sqlalchemy import create_engine
+
+from app.db.base import Base
+from app.src.auth.repository import login_lookups
+from benchmarks.common import percentile, summarize
+from benchmarks.lookup import explain, missing_indexes
+
+
+def test_percentiles_use_nearest_rank():
+    samples = [i / 1000 for i in range(1, 101)]
+
+    assert percentile(samples, 0.50) == 0.050
+    assert percentile(samples, 0.99) == 0.099
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summary_reports_milliseconds_and_throughput():
+    result = summarize("login", [0.002, 0.001, 0.004, 0.003], elapsed=2.0, errors=1)
+
+    assert result["count"] == 4
+    assert result["errors"] == 1
+    assert result["throughput_per_s"] == 2.0
+    assert (result["p50_ms"], result["p99_ms"], result["max_ms"]) == (2.0, 4.0, 4.0)
+
+
+def test_login_lookups_are_served_by_the_lower_indexes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        plans = [explain(connection, query) for query in login_lookups("Bench1@Example.com")]
+        # Only Postgres defers them to `migrate`
+        assert missing_indexes(connection) == []
+    engine.dispose()
+
+    assert [plan["indexes"] for plan in plans] == [
+        ["uq_users_email_lower"],
+        ["uq_users_username_lower"],
+    ]
+    assert not any(plan["table_scan"] for plan in plans)
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from app.src.auth.cache import TTLCache, UserCache
+from app.src.auth.models import User
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.src.auth.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_disabled_when_maxsize_is_zero():
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_user_cache_hands_out_independent_snapshots():
+    cache = UserCache(maxsize=10, ttl=60)
+    now = datetime.utcnow()
+    cache.set(
+        User(
+            id=7,
+            email="a@x.com",
+            username="alice",
+            hashed_password="hash",
+            is_active=True,
+            is_superuser=False,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+
+    first = cache.get(7)
+    assert first is not None
+    first.username = "mallory"
+
+    second = cache.get(7)
+    assert second is not None
+    assert second.username == "alice"
+
+    cache.invalidate(7)
+    assert cache.get(7) is None
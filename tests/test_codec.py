@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from app.src.auth.codec import FastTokenCodec, JoseTokenCodec, TokenCodec, claims_are_valid
+from app.src.auth.keys import KeyRing
+from app.src.auth.security import build_token_codec
+
+SECRET = "test-secret"
+
+
+def _key_ring(tmp_path, algorithm):
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    (tmp_path / "k1.pem").write_bytes(pem)
+    return KeyRing.from_directory(str(tmp_path), algorithm)
+
+
+@pytest.fixture(params=["HS256", "RS256", "ES256"])
+def codecs(request, tmp_path):
+    key_ring = None if request.param == "HS256" else _key_ring(tmp_path, request.param)
+    return (
+        FastTokenCodec(request.param, SECRET, key_ring),
+        JoseTokenCodec(request.param, SECRET, key_ring),
+    )
+
+
+def _claims(**extra):
+    return {"sub": "1", "jti": "abc", "exp": int(time.time()) + 60, **extra}
+
+
+def test_fast_and_jose_codecs_read_each_others_tokens(codecs):
+    fast, jose = codecs
+    claims = _claims(username="alice")
+
+    assert jose.decode(fast.encode(claims)) == claims
+    assert fast.decode(jose.encode(claims)) == claims
+
+
+def test_fast_codec_rejects_tampered_and_foreign_tokens(codecs):
+    fast, _ = codecs
+    header, payload, signature = fast.encode(_claims()).split(".")
+    other = fast.encode(_claims(sub="2")).split(".")[1]
+
+    assert fast.decode(f"{header}.{other}.{signature}") is None
+    assert fast.decode(f"{header}.{payload}.{signature[:-4]}AAAA") is None
+    assert fast.decode(f"{header}.{payload}") is None
+    assert fast.decode("eyJhbGciOiJub25lIn0.e30.") is None
+    assert fast.decode("not-a-token") is None
+    assert FastTokenCodec("HS256", "other-secret").decode(fast.encode(_claims())) is None
+
+
+def test_fast_codec_rejects_expired_tokens(codecs):
+    fast, _ = codecs
+
+    assert fast.decode(fast.encode(_claims(exp=int(time.time()) - 1))) is None
+
+
+@pytest.mark.parametrize(
+    "claims, valid",
+    [
+        ({"exp": 200}, True),
+        ({"exp": 99}, False),
+        ({"exp": "200"}, False),
+        ({"nbf": 101}, False),
+        ({"iat": "x"}, False),
+        ({"aud": "other"}, False),
+        ({"sub": 1}, False),
+        ({"jti": 1}, False),
+    ],
+)
+def test_registered_claim_checks(claims, valid):
+    assert claims_are_valid(claims, now=100) is valid
+
+
+def test_codecs_must_implement_encode_and_decode():
+    class EncodeOnly(TokenCodec):
+        def encode(self, claims):
+            return ""
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
+
+
+def test_build_token_codec_falls_back_to_jose_and_caches():
+    assert isinstance(build_token_codec("fast", "HS256", SECRET, None), FastTokenCodec)
+    assert isinstance(build_token_codec("jose", "HS256", SECRET, None), JoseTokenCodec)
+    # No fast implementation for RSA-PSS
+    assert isinstance(build_token_codec("fast", "PS256", SECRET, None), JoseTokenCodec)
+    assert build_token_codec("fast", "HS256", SECRET, None) is build_token_codec(
+        "fast", "HS256", SECRET, None
+    )
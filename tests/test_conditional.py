@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.conditional import conditional_response, entity_tag, http_date, is_not_modified
+
+UPDATED_AT = datetime(2026, 1, 2, 3, 4, 5, 678901)
+ETAG = entity_tag(7, UPDATED_AT)
+
+
+def test_entity_tag_changes_with_every_update():
+    assert ETAG == entity_tag(7, UPDATED_AT)
+    assert ETAG != entity_tag(7, UPDATED_AT + timedelta(microseconds=1))
+    assert ETAG != entity_tag(8, UPDATED_AT)
+    assert ETAG.startswith('"') and not ETAG.startswith("W/")
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    later = http_date(UPDATED_AT + timedelta(seconds=1))
+
+    assert is_not_modified({"if-none-match": ETAG}, ETAG, UPDATED_AT)
+    assert is_not_modified({"if-none-match": f'"x", W/{ETAG}'}, ETAG, UPDATED_AT)
+    assert is_not_modified({"if-none-match": "*"}, ETAG, UPDATED_AT)
+    assert not is_not_modified(
+        {"if-none-match": '"stale"', "if-modified-since": later}, ETAG, UPDATED_AT
+    )
+
+
+def test_if_modified_since_uses_second_resolution():
+    assert is_not_modified({"if-modified-since": http_date(UPDATED_AT)}, ETAG, UPDATED_AT)
+    earlier = http_date(UPDATED_AT - timedelta(seconds=1))
+    assert not is_not_modified({"if-modified-since": earlier}, ETAG, UPDATED_AT)
+    assert not is_not_modified({"if-modified-since": "garbage"}, ETAG, UPDATED_AT)
+    assert not is_not_modified({}, ETAG, UPDATED_AT)
+
+
+def test_not_modified_responses_skip_rendering():
+    rendered = []
+    app = FastAPI()
+
+    @app.get("/item")
+    def item(request: Request):
+        def render():
+            rendered.append(True)
+            return JSONResponse({"id": 7})
+
+        return conditional_response(
+            request.headers, ETAG, UPDATED_AT, render, "private, no-cache", vary="Authorization"
+        )
+
+    client = TestClient(app)
+    first = client.get("/item")
+    again = client.get("/item", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200 and first.json() == {"id": 7}
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert first.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == ETAG and again.headers["vary"] == "Authorization"
+    assert rendered == [True]
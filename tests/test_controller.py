@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.src.auth import controller
+from app.src.auth.cache import user_cache
+from app.src.auth.controller import AuthController
+from app.src.auth.dependencies import verify_introspection_key
+from app.src.auth.models import User
+from app.src.auth.revocation import denylist
+from app.src.auth.schemas import LoginRequest, PasswordChange, UserCreate
+from app.src.auth.security import (
+    PasswordHashingEngine,
+    build_password_context,
+    create_access_token,
+    decode_access_token,
+)
+
+# What the stored hashes looked like under an older, cheaper BCRYPT_ROUNDS
+old_context = build_password_context("bcrypt", 4, 2, 19456)
+
+
+class RacingEngine(PasswordHashingEngine):
+    """Thread-pool engine that can run ``during_verify`` while a login is verifying."""
+
+    during_verify = None
+
+    async def verify_and_update(self, plain_password, hashed_password):
+        result = await super().verify_and_update(plain_password, hashed_password)
+        if self.during_verify is not None:
+            await self.during_verify()
+        return result
+
+
+@pytest.fixture
+def hashing(monkeypatch):
+    engine = RacingEngine(workers=0, max_pending=8, retry_after=1)
+    monkeypatch.setattr(controller, "hashing_engine", engine)
+    return engine
+
+
+async def _login(db, username, password="Senha123"):
+    db.add(User(email=f"{username}@x.com", username=username, hashed_password=password))
+    await db.commit()
+    return await AuthController(db).login(
+        LoginRequest(username=username, password="Senha123"), "10.0.0.1"
+    )
+
+
+def test_login_rehashes_an_outdated_hash(run_db, hashing):
+    async def scenario(db):
+        token = await _login(db, "rehash", old_context.hash("Senha123"))
+        return token, await db.scalar(select(User.hashed_password))
+
+    token, stored = run_db(scenario)
+
+    assert token.access_token
+    assert stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+
+def test_rehash_does_not_undo_a_password_change_made_meanwhile(run_db, hashing):
+    changed = old_context.hash("Nova1234")
+
+    async def scenario(db):
+        async def change_password():
+            await db.execute(update(User).values(hashed_password=changed))
+            await db.commit()
+
+        hashing.during_verify = change_password
+        await _login(db, "racer", old_context.hash("Senha123"))
+        return await db.scalar(select(User.hashed_password))
+
+    assert run_db(scenario) == changed
+
+
+@pytest.mark.parametrize(
+    "configured, sent, status_code",
+    [(None, None, 503), (None, "", 503), ("s3cret", None, 401), ("s3cret", "wrong", 401)],
+)
+def test_introspection_is_refused_without_the_configured_key(
+    monkeypatch, configured, sent, status_code
+):
+    monkeypatch.setattr(settings, "INTROSPECTION_API_KEY", configured)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(verify_introspection_key(sent))
+
+    assert exc_info.value.status_code == status_code
+
+
+def test_introspection_accepts_the_configured_key(monkeypatch):
+    monkeypatch.setattr(settings, "INTROSPECTION_API_KEY", "s3cret")
+
+    assert asyncio.run(verify_introspection_key("s3cret")) is None
+
+
+def test_introspect_resolves_users_from_the_cache_and_one_query(run_db, monkeypatch):
+    user_cache.clear()
+    queried = []
+
+    async def scenario(db):
+        db.add_all(
+            [
+                User(id=1, email="a@x.com", username="alice", hashed_password="h"),
+                User(id=2, email="b@x.com", username="bob", hashed_password="h", is_active=False),
+            ]
+        )
+        await db.commit()
+        # Only in the cache: introspection must not need the database for it
+        user_cache.set(User(id=3, email="c@x.com", username="carol", is_active=True))
+
+        auth = AuthController(db)
+        get_many = auth.repository.get_many
+
+        async def counting_get_many(db, user_ids):
+            queried.append(sorted(user_ids))
+            return await get_many(db, user_ids)
+
+        monkeypatch.setattr(auth.repository, "get_many", counting_get_many)
+        tokens = [create_access_token({"sub": str(user_id)}) for user_id in (1, 2, 3, 4, 1)]
+        return await auth.introspect(tokens + ["not-a-token"])
+
+    try:
+        response = run_db(scenario)
+    finally:
+        user_cache.clear()
+
+    assert [result.active for result in response.results] == [
+        True,
+        False,
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert response.results[0].claims["sub"] == "1"
+    assert response.results[1].claims is None
+    assert queried == [[1, 2, 4]]
+
+
+def test_duplicate_registrations_are_refused_by_the_unique_indexes(run_db, hashing, monkeypatch):
+    async def scenario(db):
+        auth = AuthController(db)
+
+        async def no_pre_check(db, emails, usernames):
+            raise AssertionError("find_taken before the INSERT")
+
+        monkeypatch.setattr(auth.repository, "find_taken", no_pre_check)
+        await auth.register(UserCreate(email="a@x.com", username="alice", password="Senha123"))
+        details = []
+        for email, username in (("a@x.com", "other"), ("b@x.com", "alice"), ("A@x.com", "xavier")):
+            with pytest.raises(HTTPException) as exc_info:
+                await auth.register(UserCreate(email=email, username=username, password="Senha123"))
+            details.append((exc_info.value.status_code, exc_info.value.detail))
+        return details
+
+    assert run_db(scenario) == [
+        (400, "Email já cadastrado no sistema"),
+        (400, "Username já está em uso"),
+        (400, "Email já cadastrado no sistema"),
+    ]
+
+
+def test_unrecognised_unique_violations_are_looked_up(run_db, hashing, monkeypatch):
+    async def scenario(db):
+        auth = AuthController(db)
+        await auth.register(UserCreate(email="a@x.com", username="alice", password="Senha123"))
+
+        async def unnamed_violation(db, user_in, hashed_password):
+            raise IntegrityError("INSERT", {}, Exception("duplicate key value"))
+
+        monkeypatch.setattr(auth.repository, "create_user", unnamed_violation)
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.register(UserCreate(email="b@x.com", username="ALICE", password="Senha123"))
+        with pytest.raises(IntegrityError):
+            await auth.register(UserCreate(email="c@x.com", username="carol", password="Senha123"))
+        return exc_info.value.status_code, exc_info.value.detail
+
+    assert run_db(scenario) == (400, "Username já está em uso")
+
+
+def test_change_password_revokes_every_token_issued_before_it(run_db, hashing):
+    async def scenario(db):
+        auth = AuthController(db)
+        user = await auth.register(
+            UserCreate(email="a@x.com", username="alice", password="Senha123")
+        )
+        credentials = LoginRequest(username="alice", password="Senha123")
+        presented = await auth.login(credentials, "10.0.0.1")
+        other_device = await auth.login(credentials, "10.0.0.2")
+
+        account = await auth.repository.get(db, user.id)
+        await auth.change_password(
+            account, PasswordChange(current_password="Senha123", new_password="Nova1234")
+        )
+        fresh = await auth.login(LoginRequest(username="alice", password="Nova1234"), "10.0.0.1")
+        tokens = (presented, other_device, fresh)
+        return [decode_access_token(token.access_token) for token in tokens]
+
+    try:
+        presented, other_device, fresh = run_db(scenario)
+    finally:
+        denylist.clear()
+
+    assert presented is None and other_device is None
+    assert fresh is not None and fresh["username"] == "alice"
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.async_session import get_async_db, get_async_session_factory
+from app.src.auth.dependencies import get_current_superuser
+from app.src.auth.export import EXPORT_FIELDS, csv_header, encode_csv, encode_ndjson
+from app.src.auth.models import User
+from app.src.auth.router import router
+
+ROWS = [
+    (1, "a@x.com", "alice", 'Alice "A", Jr', True, False, datetime(2025, 1, 2, 3, 4, 5), None),
+    (2, "b@x.com", "bob", None, False, True, datetime(2025, 1, 3), datetime(2025, 1, 4)),
+]
+
+
+def test_ndjson_one_object_per_line():
+    lines = encode_ndjson(ROWS).decode().splitlines()
+
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert list(first) == list(EXPORT_FIELDS)
+    assert first["full_name"] == 'Alice "A", Jr'
+    assert first["created_at"] == "2025-01-02T03:04:05"
+    assert first["updated_at"] is None
+
+
+def test_csv_quotes_and_header():
+    header = csv_header().decode()
+    assert header == ",".join(EXPORT_FIELDS) + "\n"
+
+    lines = encode_csv(ROWS).decode().splitlines()
+
+    assert lines[0] == '1,a@x.com,alice,"Alice ""A"", Jr",True,False,2025-01-02T03:04:05,'
+    assert lines[1].startswith("2,b@x.com,bob,,False,True,")
+
+
+def test_csv_neutralizes_cells_that_spreadsheets_would_run_as_formulas():
+    rows = [
+        (3, "-x@x.com", "=cmd", "+1", True, False, None, None),
+        (4, "@x", "\tt", "ok", 1, 0, None, None),
+    ]
+
+    lines = encode_csv(rows).decode().splitlines()
+
+    assert lines[0] == "3,'-x@x.com,'=cmd,'+1,True,False,,"
+    assert lines[1] == "4,'@x,'\tt,ok,1,0,,"
+
+
+def test_export_endpoint_streams_from_the_session_factory(run_engines):
+    async def scenario(engine):
+        async with engine.begin() as connection:
+            await connection.execute(
+                User.__table__.insert(),
+                [
+                    {"email": f"{name}@x.com", "username": name, "hashed_password": "h"}
+                    for name in ("alice", "=bob")
+                ],
+            )
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_current_superuser] = lambda: User(id=1, is_superuser=True)
+        app.dependency_overrides[get_async_db] = lambda: None
+        app.dependency_overrides[get_async_session_factory] = lambda: async_sessionmaker(
+            engine, expire_on_commit=False
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ndjson = await client.get("/auth/users/export")
+            csv = await client.get("/auth/users/export", params={"format": "csv"})
+        return ndjson, csv
+
+    ndjson, csv = run_engines(scenario)
+
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["username"] for line in ndjson.text.splitlines()] == [
+        "alice",
+        "=bob",
+    ]
+    assert csv.headers["content-disposition"] == 'attachment; filename="users.csv"'
+    header, *lines = csv.text.splitlines()
+    assert header == ",".join(EXPORT_FIELDS)
+    assert [line.split(",")[2] for line in lines] == ["alice", "'=bob"]
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.src.auth.security import (
+    HashingQueueFull,
+    PasswordHashingEngine,
+    build_password_context,
+    calibrate_bcrypt_rounds,
+    verify_password,
+)
+
+
+def test_engine_hash_and_verify_in_thread_fallback():
+    engine = PasswordHashingEngine(workers=0, max_pending=4, retry_after=1)
+
+    async def run():
+        hashed = await engine.hash("Senha123")
+        return hashed, await engine.verify("Senha123", hashed), await engine.verify("x1", hashed)
+
+    hashed, ok, wrong = asyncio.run(run())
+    assert verify_password("Senha123", hashed) is True
+    assert ok is True
+    assert wrong is False
+    assert engine.pending == 0
+
+
+def test_engine_process_pool_roundtrip():
+    engine = PasswordHashingEngine(workers=1, max_pending=4, retry_after=1)
+    try:
+        hashed = asyncio.run(engine.hash("Senha123"))
+        assert asyncio.run(engine.verify("Senha123", hashed)) is True
+    finally:
+        engine.shutdown()
+
+
+def test_engine_rejects_when_queue_is_full():
+    engine = PasswordHashingEngine(workers=0, max_pending=1, retry_after=3)
+
+    async def run():
+        first = asyncio.ensure_future(engine.hash("Senha123"))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingQueueFull) as exc_info:
+            await engine.hash("Outra123")
+        await first
+        return exc_info.value
+
+    exc = asyncio.run(run())
+    assert exc.retry_after == 3
+    assert engine.pending == 0
+
+
+def test_hash_many_preserves_order():
+    engine = PasswordHashingEngine(workers=0, max_pending=8, retry_after=1)
+
+    hashes = asyncio.run(engine.hash_many(["Senha1", "Senha2", "Senha3"]))
+
+    assert [verify_password(f"Senha{i}", hashed) for i, hashed in enumerate(hashes, 1)] == [
+        True,
+        True,
+        True,
+    ]
+    assert asyncio.run(engine.hash_many([])) == []
+
+
+def test_outdated_hashes_are_upgraded_to_the_configured_cost():
+    old_context = build_password_context("bcrypt", 4, 2, 19456)
+    context = build_password_context("bcrypt", 5, 2, 19456)
+    old_hash = old_context.hash("Senha123")
+
+    assert context.needs_update(old_hash) is True
+    valid, new_hash = context.verify_and_update("Senha123", old_hash)
+    assert valid is True
+    assert new_hash.startswith("$2b$05$")
+    assert context.needs_update(new_hash) is False
+    assert context.verify_and_update("errada1", old_hash) == (False, None)
+
+
+def test_calibration_picks_the_costliest_rounds_within_target():
+    result = calibrate_bcrypt_rounds(10.0, min_rounds=4, max_rounds=6, samples=1)
+
+    assert result["rounds"] == 6
+    assert set(result["measured_ms"]) >= {8, 6}
+
+    cheapest = calibrate_bcrypt_rounds(0.000001, min_rounds=4, max_rounds=6, samples=1)
+    assert cheapest["rounds"] == 4
+
+
+def test_hash_many_leaves_a_worker_and_queue_room_for_logins():
+    engine = PasswordHashingEngine(workers=4, max_pending=8, retry_after=1)
+    batch = {"in_flight": 0, "max": 0, "rejected": 0}
+
+    async def fake_submit(operation, fn, password):
+        if engine._pending >= engine.max_pending:
+            batch["rejected"] += 1
+            raise HashingQueueFull(1)
+        engine._pending += 1
+        batch["in_flight"] += 1
+        batch["max"] = max(batch["max"], batch["in_flight"])
+        await asyncio.sleep(0.001)
+        batch["in_flight"] -= 1
+        engine._pending -= 1
+        return f"hashed:{password}"
+
+    async def run():
+        # Interactive jobs fill the queue for a moment
+        engine._pending = 8
+        asyncio.get_running_loop().call_later(0.02, setattr, engine, "_pending", 0)
+        return await engine.hash_many([f"Senha{n}" for n in range(10)])
+
+    engine._submit = fake_submit
+    hashes = asyncio.run(run())
+
+    assert hashes == [f"hashed:Senha{n}" for n in range(10)]
+    assert batch["max"] == 3
+    assert batch["rejected"] > 0
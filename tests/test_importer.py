@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.src.auth import importer
+from app.src.auth.models import User
+from app.src.auth.security import PasswordHashingEngine, verify_password
+
+
+def _run_import(run_db, rows, existing=()):
+    async def scenario(db):
+        db.add_all(User(hashed_password="x", **user) for user in existing)
+        await db.commit()
+        report = await importer.UserImporter(batch_size=2).run(db, rows)
+        users = (await db.execute(select(User).order_by(User.id))).scalars().all()
+        count = await db.scalar(select(func.count()).select_from(User))
+        return report, users, count
+
+    return run_db(scenario)
+
+
+@pytest.fixture(autouse=True)
+def thread_hashing(monkeypatch):
+    monkeypatch.setattr(
+        importer, "hashing_engine", PasswordHashingEngine(workers=0, max_pending=8, retry_after=1)
+    )
+
+
+def test_import_reports_every_row(run_db):
+    rows = [
+        {"email": "a@x.com", "username": "alice", "password": "Senha123"},
+        {"email": "taken@x.com", "username": "bob", "password": "Senha123"},
+        {"email": "a@x.com", "username": "carol", "password": "Senha123"},
+        {"email": "d@x.com", "username": "dave", "password": "curta"},
+        {"email": "e@x.com", "username": "erin", "password": "Senha123", "full_name": "Erin"},
+    ]
+
+    report, users, count = _run_import(
+        run_db, rows, existing=[{"email": "taken@x.com", "username": "taken"}]
+    )
+
+    assert (report.created, report.failed) == (2, 3)
+    assert [result.index for result in report.results] == [0, 1, 2, 3, 4]
+    assert [result.success for result in report.results] == [True, False, False, False, True]
+    assert report.results[1].error == "Email já cadastrado no sistema"
+    assert report.results[2].error == "Email repetido na importação"
+    assert report.results[3].error.startswith("password:")
+
+    assert count == 3
+    created = {user.username: user for user in users}
+    assert created["erin"].full_name == "Erin"
+    assert created["alice"].id == report.results[0].id
+    assert verify_password("Senha123", created["alice"].hashed_password)
+
+
+def test_import_ignores_case_when_checking_duplicates(run_db):
+    rows = [
+        {"email": "TAKEN@x.com", "username": "bob", "password": "Senha123"},
+        {"email": "c@x.com", "username": "Carol", "password": "Senha123"},
+        {"email": "d@x.com", "username": "CAROL", "password": "Senha123"},
+    ]
+
+    report, _, count = _run_import(
+        run_db, rows, existing=[{"email": "taken@x.com", "username": "taken"}]
+    )
+
+    assert [result.error for result in report.results] == [
+        "Email já cadastrado no sistema",
+        None,
+        "Username repetido na importação",
+    ]
+    assert count == 2
+
+
+def test_batches_stay_under_the_bind_parameter_limit():
+    assert importer.UserImporter(batch_size=100_000).batch_size == importer.MAX_BATCH_SIZE
+    assert importer.MAX_BATCH_SIZE * len(User.__table__.columns) <= 32767
+    assert importer.UserImporter(batch_size=0).batch_size == 1
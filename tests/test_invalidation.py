@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.src.auth import invalidation
+from app.src.auth.cache import user_cache
+from app.src.auth.models import User
+from app.src.auth.repository import UserRepository
+from app.src.auth.revocation import denylist
+from app.src.auth.schemas import UserCreate, UserUpdate
+
+
+@pytest.fixture
+def notified(monkeypatch):
+    """A sqlite session whose ``pg_notify`` records the payloads it receives."""
+    payloads = []
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_connection, connection_record):
+        dbapi_connection.create_function(
+            "pg_notify", 2, lambda channel, payload: payloads.append((channel, payload))
+        )
+
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(invalidation, "NOTIFY_DIALECTS", {"sqlite"})
+    db = sessionmaker(bind=engine)()
+    yield db, payloads
+    db.close()
+    engine.dispose()
+
+
+def test_user_changes_notify_on_commit_only(notified):
+    db, payloads = notified
+    repository = UserRepository()
+    user = repository.create_user(
+        db, UserCreate(email="a@x.com", username="alice", password="Senha123"), "hash"
+    )
+    user_id = user.id
+    assert payloads == []
+
+    repository.update(db, user_id, UserUpdate(full_name="Alice"))
+    repository.set_password_hash(db, user, "other-hash")
+
+    invalidation.publish(db, invalidation.USER, user_id)
+    db.rollback()
+    repository.remove(db, user_id)
+
+    assert payloads == [(invalidation.CHANNEL, f"user:{user_id}")] * 3
+
+
+def test_apply_evicts_users_and_denylists_tokens():
+    user_cache.set(User(id=42, email="a@x.com", username="alice", hashed_password="h"))
+    expires_at = time.time() + 60
+
+    invalidation.apply("user:42")
+    invalidation.apply(f"revoked:some-jti:{expires_at}")
+    invalidation.apply("user:not-a-number")
+
+    assert user_cache.get(42) is None
+    assert denylist.is_revoked("some-jti") is True
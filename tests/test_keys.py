@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.src.auth.keys import KeyRing, KeyRingError
+
+
+def _write_rsa_key(directory, kid, public_only=False):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if public_only:
+        pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        (directory / f"{kid}.pub.pem").write_bytes(pem)
+    else:
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        (directory / f"{kid}.pem").write_bytes(pem)
+
+
+@pytest.fixture
+def rs256_settings(tmp_path, monkeypatch):
+    import app.src.auth.security as security
+
+    _write_rsa_key(tmp_path, "2025-01")
+    _write_rsa_key(tmp_path, "2026-01")
+    monkeypatch.setattr(security.settings, "ALGORITHM", "RS256")
+    monkeypatch.setattr(security.settings, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(security.settings, "JWT_ACTIVE_KID", None)
+    security.get_key_ring.cache_clear()
+    security.token_cache.clear()
+    yield tmp_path
+    security.get_key_ring.cache_clear()
+    security.token_cache.clear()
+
+
+def test_rs256_tokens_carry_kid_of_newest_key(rs256_settings):
+    from jose import jwt
+
+    import app.src.auth.security as security
+
+    token = security.create_access_token({"sub": "1"})
+
+    assert jwt.get_unverified_header(token)["kid"] == "2026-01"
+    assert security.decode_access_token(token)["sub"] == "1"
+
+
+def test_tokens_signed_by_a_retired_key_still_verify(rs256_settings, monkeypatch):
+    import app.src.auth.security as security
+
+    monkeypatch.setattr(security.settings, "JWT_ACTIVE_KID", "2025-01")
+    security.get_key_ring.cache_clear()
+    old_token = security.create_access_token({"sub": "1"})
+
+    monkeypatch.setattr(security.settings, "JWT_ACTIVE_KID", "2026-01")
+    security.get_key_ring.cache_clear()
+    security.token_cache.clear()
+
+    assert security.decode_access_token(old_token)["sub"] == "1"
+
+
+def test_jwks_publishes_only_public_material(rs256_settings):
+    _write_rsa_key(rs256_settings, "2024-01", public_only=True)
+    ring = KeyRing.from_directory(str(rs256_settings), "RS256")
+
+    jwks = ring.jwks()
+
+    assert [key["kid"] for key in jwks["keys"]] == ["2024-01", "2025-01", "2026-01"]
+    assert all(key["use"] == "sig" and key["alg"] == "RS256" for key in jwks["keys"])
+    assert all("d" not in key for key in jwks["keys"])
+    json.dumps(jwks)
+
+
+def test_key_ring_requires_a_private_key_for_the_active_kid(rs256_settings):
+    with pytest.raises(KeyRingError):
+        KeyRing.from_directory(str(rs256_settings), "RS256", active_kid="missing")
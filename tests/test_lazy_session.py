@@ -0,0 +1,36 @@
+from app.db.lazy import LazySession, SessionUsage
+
+
+class FakeSession:
+    def __init__(self):
+        self.queries = []
+
+    def execute(self, statement):
+        self.queries.append(statement)
+        return len(self.queries)
+
+
+def test_session_is_only_created_on_first_use():
+    created = []
+
+    def factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    db = LazySession(factory)
+    assert db.started is False
+    assert created == []
+
+    assert db.execute("SELECT 1") == 1
+    assert db.execute("SELECT 2") == 2
+    assert db.started is True
+    assert len(created) == 1
+    assert db.session.queries == ["SELECT 1", "SELECT 2"]
+
+
+def test_usage_counts_requests_that_never_touched_the_session():
+    usage = SessionUsage()
+    for used in (True, False, False, False):
+        usage.record(used)
+
+    assert usage.as_dict() == {"requests": 4, "used": 1, "unused": 3, "unused_ratio": 0.75}
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import instrument_engine, method_label, route_template
+from app.db.pool import PoolCollector
+
+
+def _count(name, **labels):
+    return REGISTRY.get_sample_value(f"{name}_count", labels) or 0.0
+
+
+def test_route_template_includes_the_router_prefixes():
+    router = APIRouter(prefix="/auth")
+    templates = []
+
+    @router.get("/users/{user_id}")
+    @router.get("/files/{name:path}")
+    @router.get("/items/")
+    def endpoint(request: Request):
+        templates.append(route_template(request.scope))
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    for path in ("/api/v1/auth/users/7", "/api/v1/auth/files/a/b/c.txt", "/api/v1/auth/items/"):
+        assert client.get(path).status_code == 200
+
+    assert templates == [
+        "/api/v1/auth/users/{user_id}",
+        "/api/v1/auth/files/{name}",
+        "/api/v1/auth/items/",
+    ]
+    assert route_template({"path": "/x", "route": SimpleNamespace(path_format="/x")}) == "/x"
+    assert route_template({"path": "/nope"}) == "unmatched"
+
+
+def test_instrumented_engine_times_statements_by_type():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = _count("db_query_seconds", operation="select")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("  select 2"))
+
+    assert _count("db_query_seconds", operation="select") == before + 2
+
+
+def test_pool_collector_exports_gauges_per_engine():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=3)
+    families = {family.name: family for family in PoolCollector({"test": engine}).collect()}
+
+    size = families["db_pool_size"].samples
+    assert [(sample.labels, sample.value) for sample in size] == [({"engine": "test"}, 3)]
+
+
+def test_non_standard_methods_share_one_label():
+    assert method_label({"method": "PATCH"}) == "PATCH"
+    assert method_label({"method": "PURGE"}) == "other"
+    assert method_label({"method": "get"}) == "other"
+
+
+def test_metrics_endpoint_requires_the_key_once_configured(monkeypatch):
+    from app import main
+
+    client = TestClient(main.app)
+    assert client.get("/metrics").status_code == 200
+
+    monkeypatch.setattr(main.settings, "METRICS_API_KEY", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert b"http_request_duration_seconds" in response.content
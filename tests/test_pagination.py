@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.db.pagination import BACKWARD, FORWARD, InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2025, 10, 29, 22, 58, 51, 781103)
+
+    cursor = encode_cursor(created_at, 42, FORWARD)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42, FORWARD)
+    assert decode_cursor(encode_cursor(created_at, 42, BACKWARD))[2] == BACKWARD
+
+
+def _raw_cursor(*values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "zzz",
+        "bm90LWpzb24",
+        encode_cursor(datetime.now(), 1, "x"),
+        encode_cursor(datetime.now(), "1", FORWARD),
+        encode_cursor(datetime.now(), 1.5, FORWARD),
+        encode_cursor(datetime.now(), True, FORWARD),
+        encode_cursor(datetime.now(timezone.utc), 1, FORWARD),
+        _raw_cursor(None, 1, FORWARD),
+        _raw_cursor("2025-10-29", 1, FORWARD, "extra"),
+    ],
+)
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
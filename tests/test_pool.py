@@ -0,0 +1,60 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    engine_options,
+    pool_stats,
+    resolve_pool_profile,
+)
+
+
+def test_resolve_pool_profile(monkeypatch):
+    from app.db import pool
+
+    monkeypatch.setattr(pool.settings, "DB_POOL_PROFILE", None)
+    monkeypatch.setattr(pool.settings, "DB_USE_NULLPOOL", False)
+    assert resolve_pool_profile("postgresql://u:p@db:5432/auth") == "default"
+    assert (
+        resolve_pool_profile("postgresql://u:p@aws-0.pooler.supabase.com:6543/postgres")
+        == "pgbouncer"
+    )
+
+    monkeypatch.setattr(pool.settings, "DB_USE_NULLPOOL", True)
+    assert resolve_pool_profile("postgresql://u:p@db:5432/auth") == "nullpool"
+
+    monkeypatch.setattr(pool.settings, "DB_POOL_PROFILE", "PgBouncer")
+    assert resolve_pool_profile("postgresql://u:p@db:5432/auth") == "pgbouncer"
+
+
+def test_pgbouncer_profile_disables_asyncpg_statement_cache():
+    url = make_url("postgresql+asyncpg://u:p@pooler:6543/postgres")
+
+    options = engine_options(url, "pgbouncer", is_async=True)
+
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+    assert options["connect_args"]["statement_cache_size"] == 0
+
+
+def test_nullpool_profile():
+    options = engine_options(make_url("sqlite://"), "nullpool", is_async=False)
+    assert options["poolclass"] is NullPool
+
+
+def test_pool_stats_report_checkouts(tmp_path):
+    url = make_url(f"sqlite:///{tmp_path / 'pool.db'}")
+    engine = create_engine(url, **engine_options(url, "default", is_async=False))
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        stats = pool_stats(engine.pool)
+        assert stats["checked_out"] == 1
+
+    stats = pool_stats(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+    assert stats["checkouts"] == 1
+    engine.dispose()
@@ -0,0 +1,199 @@
+import asyncio
+
+import pytest
+
+from app.src.auth.ratelimit import (
+    LoginThrottle,
+    LoginThrottled,
+    MemoryBackend,
+    RateLimitBackend,
+    client_ip,
+)
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_throttle(clock: Clock, **overrides) -> LoginThrottle:
+    options = dict(
+        ip_limit=5,
+        ip_window=60,
+        max_failures=3,
+        failure_window=900,
+        lockout=60,
+        lockout_max=300,
+    )
+    options.update(overrides)
+    return LoginThrottle(MemoryBackend(clock=clock), clock=clock, **options)
+
+
+def test_ip_limit_throttles_every_attempt_until_the_window_slides():
+    clock = Clock()
+    throttle = make_throttle(clock)
+
+    async def run():
+        for n in range(5):
+            await throttle.check("10.0.0.1", f"user{n}")
+        with pytest.raises(LoginThrottled) as excinfo:
+            await throttle.check("10.0.0.1", "someone-else")
+        await throttle.check("10.0.0.2", "user0")
+
+        # Two windows later the old attempts no longer count
+        clock.now += 120
+        await throttle.check("10.0.0.1", "user0")
+        return excinfo.value
+
+    throttled = asyncio.run(run())
+    assert throttled.scope == "ip"
+    assert 1 <= throttled.retry_after <= 60
+
+
+def test_failures_lock_the_identifier_with_growing_lockouts():
+    clock = Clock()
+    throttle = make_throttle(clock, ip_limit=1000)
+
+    async def fail_until_locked() -> int:
+        for _ in range(3):
+            await throttle.check("10.0.0.1", "Alice")
+            await throttle.record_failure("Alice")
+        with pytest.raises(LoginThrottled) as excinfo:
+            await throttle.check("10.0.0.9", " alice ")
+        assert excinfo.value.scope == "identifier"
+        return excinfo.value.retry_after
+
+    async def run():
+        lockouts = []
+        for _ in range(4):
+            lockouts.append(await fail_until_locked())
+            clock.now += lockouts[-1]
+        return lockouts
+
+    assert asyncio.run(run()) == [60, 120, 240, 300]
+
+
+def test_success_clears_failures_and_lockout_history():
+    clock = Clock()
+    throttle = make_throttle(clock, ip_limit=1000)
+
+    async def run():
+        for _ in range(3):
+            await throttle.record_failure("alice")
+        clock.now += 60
+        await throttle.record_success("alice")
+        for _ in range(2):
+            await throttle.record_failure("alice")
+        await throttle.check("10.0.0.1", "alice")
+
+        await throttle.record_failure("alice")
+        with pytest.raises(LoginThrottled) as excinfo:
+            await throttle.check("10.0.0.1", "alice")
+        return excinfo.value.retry_after
+
+    # Back to the first lockout length, not the doubled one
+    assert asyncio.run(run()) == 60
+
+
+def test_backend_errors_let_logins_through():
+    class BrokenBackend(RateLimitBackend):
+        async def get_many(self, keys):
+            raise ConnectionError("redis is down")
+
+        async def incr(self, key, ttl):
+            raise ConnectionError("redis is down")
+
+        async def set(self, key, value, ttl):
+            raise ConnectionError("redis is down")
+
+        async def ttl(self, key):
+            raise ConnectionError("redis is down")
+
+        async def delete(self, *keys):
+            raise ConnectionError("redis is down")
+
+    throttle = LoginThrottle(
+        BrokenBackend(),
+        ip_limit=1,
+        ip_window=60,
+        max_failures=1,
+        failure_window=60,
+        lockout=60,
+        lockout_max=60,
+    )
+
+    async def run():
+        for _ in range(3):
+            await throttle.check("10.0.0.1", "alice")
+            await throttle.record_failure("alice")
+
+    asyncio.run(run())
+
+
+def test_memory_backend_stays_bounded():
+    backend = MemoryBackend(maxsize=10)
+
+    async def run():
+        for n in range(50):
+            await backend.incr(f"key{n}", ttl=60)
+
+    asyncio.run(run())
+    assert len(backend) == 10
+
+
+def test_memory_backend_evicts_the_oldest_writes_first():
+    clock = Clock()
+    backend = MemoryBackend(maxsize=3, clock=clock)
+
+    async def run():
+        await backend.incr("expired", ttl=1)
+        await backend.incr("a", ttl=60)
+        await backend.incr("b", ttl=60)
+        clock.now += 2
+        # Expired keys at the old end go as soon as anything is written
+        await backend.incr("a", ttl=60)
+        assert len(backend) == 2
+        await backend.incr("c", ttl=60)
+        await backend.incr("d", ttl=60)
+        return await backend.get_many(["b", "a", "c", "d"])
+
+    assert asyncio.run(run()) == [0, 2, 1, 1]
+
+
+def test_spraying_identifiers_does_not_evict_lockouts():
+    clock = Clock()
+    throttle = LoginThrottle(
+        MemoryBackend(maxsize=10, clock=clock),
+        clock=clock,
+        ip_limit=1000,
+        ip_window=60,
+        max_failures=3,
+        failure_window=900,
+        lockout=60,
+        lockout_max=300,
+    )
+
+    async def run():
+        for _ in range(3):
+            await throttle.record_failure("alice")
+        for n in range(50):
+            await throttle.check("6.6.6.6", f"x:lock:{n}")
+            await throttle.record_failure(f"x:lock:{n}")
+        with pytest.raises(LoginThrottled) as excinfo:
+            await throttle.check("10.0.0.1", "alice")
+        return excinfo.value.scope
+
+    assert asyncio.run(run()) == "identifier"
+    assert len(throttle.backend) <= 20
+
+
+def test_client_ip_only_trusts_proxy_appended_entries():
+    headers = {"x-forwarded-for": "6.6.6.6, 203.0.113.7, 10.0.0.2"}
+
+    assert client_ip(headers, "10.0.0.1", trusted_hops=0) == "10.0.0.1"
+    assert client_ip(headers, "10.0.0.1", trusted_hops=1) == "10.0.0.2"
+    assert client_ip(headers, "10.0.0.1", trusted_hops=2) == "203.0.113.7"
+    assert client_ip({}, None, trusted_hops=1) == "unknown"
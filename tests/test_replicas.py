@@ -0,0 +1,129 @@
+import asyncio
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.replicas import ReplicaSet, RoutingSession, _probe, read_with_fallback, use_primary
+from app.src.auth.models import User
+from app.src.auth.repository import AsyncUserRepository
+from app.src.auth.schemas import UserUpdate
+
+repository = AsyncUserRepository()
+
+
+def _run(run_engines, scenario):
+    """``scenario(sessions, replicas)`` with user 1 stored as primary@x.com on the
+    primary and as replica@x.com on its one replica."""
+
+    async def routed(primary, replica):
+        for engine, email in ((primary, "primary@x.com"), (replica, "replica@x.com")):
+            async with engine.begin() as connection:
+                await connection.execute(
+                    User.__table__.insert().values(
+                        id=1, email=email, username="alice", hashed_password="hash"
+                    )
+                )
+        replicas = ReplicaSet({"replica0": replica}, max_lag=5, check_interval=60)
+        sessions = async_sessionmaker(
+            primary,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replicas=replicas,
+        )
+        return await scenario(sessions, replicas)
+
+    return run_engines(routed, databases=2)
+
+
+def test_marked_reads_go_to_a_replica_and_everything_else_to_the_primary(run_engines):
+    async def scenario(sessions, replicas):
+        async with sessions() as db:
+            marked = (await repository.get(db, 1)).email
+            unmarked = (await db.execute(select(User.email))).scalar_one()
+        async with sessions() as db:
+            row = await repository.get_row(db, 1)
+        return marked, unmarked, row.email
+
+    assert _run(run_engines, scenario) == ("replica@x.com", "primary@x.com", "replica@x.com")
+
+
+def test_sessions_read_their_own_writes_from_the_primary(run_engines):
+    async def scenario(sessions, replicas):
+        async with sessions() as db:
+            await repository.update(db, 1, UserUpdate(full_name="Alice"))
+            after_write = (await repository.get_row(db, 1)).email
+        async with sessions() as db:
+            use_primary(db)
+            pinned = (await repository.get_row(db, 1)).email
+        return after_write, pinned
+
+    assert _run(run_engines, scenario) == ("primary@x.com", "primary@x.com")
+
+
+def test_unhealthy_replicas_are_skipped_until_they_recover(run_engines):
+    async def scenario(sessions, replicas):
+        (replica,) = replicas.replicas
+        replica.mark_down("test")
+        async with sessions() as db:
+            while_down = (await repository.get_row(db, 1)).email
+
+        await replicas.check_all()
+        async with sessions() as db:
+            recovered = (await repository.get_row(db, 1)).email
+
+        replicas.max_lag = -1
+        await replicas.check_all()
+        return while_down, recovered, replica.healthy, replica.error
+
+    while_down, recovered, healthy, error = _run(run_engines, scenario)
+    assert (while_down, recovered, healthy) == ("primary@x.com", "replica@x.com", False)
+    assert error.startswith("replication lag")
+
+
+class PostgresReplica:
+    """Connection to a standby answering the lag query with ``row``."""
+
+    def __init__(self, row):
+        self.row = row
+        self.dialect = type("Dialect", (), {"name": "postgresql"})()
+
+    async def execute(self, statement):
+        return self
+
+    def one(self):
+        return self.row
+
+
+def test_a_failing_replica_read_is_retried_on_the_primary(run_engines):
+    async def scenario(sessions, replicas):
+        (replica,) = replicas.replicas
+        async with replica.engine.begin() as connection:
+            await connection.execute(text("DROP TABLE users"))
+        async with sessions() as db:
+            user = await read_with_fallback(db, lambda: repository.get(db, 1))
+        return user.email, replica.healthy, replica.error
+
+    email, healthy, error = _run(run_engines, scenario)
+    assert (email, healthy) == ("primary@x.com", False)
+    assert "no such table" in error
+
+
+def test_a_standby_whose_wal_receiver_stopped_is_taken_out_of_rotation():
+    async def run():
+        return [
+            await _probe(PostgresReplica(row))
+            for row in (
+                (True, "streaming", 0),
+                (True, None, 0),
+                (True, "stopping", 0),
+                (False, None, None),
+            )
+        ]
+
+    assert asyncio.run(run()) == [
+        (0.0, None),
+        (0.0, "WAL receiver is not running"),
+        (0.0, "WAL receiver is stopping"),
+        (0.0, None),
+    ]
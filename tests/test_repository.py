@@ -0,0 +1,177 @@
+from datetime import datetime
+
+import orjson
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.responses import ORJSONResponse
+from app.db.errors import unique_violation_column
+from app.db.pagination import FORWARD, encode_cursor
+from app.src.auth.repository import AsyncUserRepository
+from app.src.auth.schemas import (
+    USER_ROW_FIELDS,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+    to_user_row,
+    user_rows_adapter,
+)
+
+repository = AsyncUserRepository()
+
+
+def _user(email, username):
+    return UserCreate(email=email, username=username, password="Senha123")
+
+
+def test_create_user_reports_the_violated_unique_column(run_db):
+    async def scenario(db):
+        user = await repository.create_user(db, _user("a@x.com", "alice"), "hash")
+        created = (user.id, user.is_active, user.created_at)
+        columns = []
+        for duplicate in (_user("a@x.com", "other"), _user("b@x.com", "alice")):
+            with pytest.raises(IntegrityError) as exc_info:
+                await repository.create_user(db, duplicate, "hash")
+            columns.append(unique_violation_column(exc_info.value, "users", ["email", "username"]))
+        return created, columns
+
+    created, columns = run_db(scenario)
+
+    user_id, is_active, created_at = created
+    assert user_id is not None
+    assert is_active is True
+    assert created_at is not None
+    assert columns == ["email", "username"]
+
+
+def test_update_returns_the_new_row_and_ignores_non_columns(run_db):
+    async def scenario(db):
+        user = await repository.create_user(db, _user("a@x.com", "alice"), "hash")
+        await repository.create_user(db, _user("b@x.com", "bob"), "hash")
+
+        user_id = user.id
+        updated = await repository.update(
+            db, user_id, UserUpdate(full_name="Alice", password="Ignorada1")
+        )
+        snapshot = (
+            updated.full_name,
+            updated.hashed_password,
+            updated.updated_at > updated.created_at,
+        )
+        with pytest.raises(IntegrityError):
+            await repository.update(db, user_id, UserUpdate(username="bob"))
+        with pytest.raises(ValueError):
+            await repository.update(db, 999, UserUpdate(full_name="x"))
+        return snapshot
+
+    assert run_db(scenario) == ("Alice", "hash", True)
+
+
+def test_read_path_returns_response_rows_that_serialize_like_user_response(run_db):
+    async def scenario(db):
+        for name in ("alice", "bob", "carol"):
+            await repository.create_user(db, _user(f"{name}@x.com", name), "hash")
+
+        page = await repository.list_users(db, limit=2)
+        user = await repository.get_by_username(db, "carol")
+        row = await repository.get_row(db, user.id)
+        missing = await repository.get_row(db, 999)
+        return page, row, missing, UserResponse.model_validate(user)
+
+    page, row, missing, response = run_db(scenario)
+
+    assert [r.username for r in page.items] == ["alice", "bob"]
+    assert page.next_cursor is not None and page.prev_cursor is None
+    assert missing is None
+    assert tuple(row._fields) == USER_ROW_FIELDS + ("updated_at",)
+    assert set(USER_ROW_FIELDS) == set(UserResponse.model_fields)
+    assert orjson.loads(ORJSONResponse(to_user_row(row)).body) == orjson.loads(
+        response.model_dump_json()
+    )
+    assert user_rows_adapter.validate_python([r._asdict() for r in page.items])[1]["id"] == 2
+
+
+def test_login_lookup_ignores_case_and_prefers_the_exact_match(run_db):
+    async def scenario(db):
+        # As in a database whose rows predate the unique lower() indexes
+        for name in ("uq_users_email_lower", "uq_users_username_lower"):
+            await db.execute(text(f"DROP INDEX {name}"))
+        await repository.create_user(db, _user("Alice@x.com", "Alice"), "hash")
+        # Username with an @ that isn't anyone's email
+        await repository.create_user(db, _user("b@x.com", "bob@home"), "hash")
+        # Differs only in case
+        await repository.create_user(db, _user("alice@x.com", "alice"), "hash")
+
+        found = [
+            await repository.get_by_email_or_username(db, identifier)
+            for identifier in ("ALICE@X.COM", "alice@x.com", "aLiCe", "Alice", "BOB@home", "x")
+        ]
+        return [user and user.id for user in found]
+
+    assert run_db(scenario) == [1, 3, 1, 1, 2, None]
+
+
+def test_accounts_differing_only_in_case_are_taken(run_db):
+    async def scenario(db):
+        await repository.create_user(db, _user("Alice@x.com", "Alice"), "hash")
+        taken = await repository.find_taken(
+            db, {"ALICE@X.COM", "bob@x.com"}, {"alice", "ALICE", "bob"}
+        )
+        columns = []
+        for duplicate in (_user("alice@x.com", "other"), _user("b@x.com", "ALICE")):
+            with pytest.raises(IntegrityError) as exc_info:
+                await repository.create_user(db, duplicate, "hash")
+            await db.rollback()
+            columns.append(unique_violation_column(exc_info.value, "users", ["email", "username"]))
+        return taken, columns
+
+    taken, columns = run_db(scenario)
+
+    assert taken == ({"ALICE@X.COM"}, {"alice", "ALICE"})
+    assert columns == ["email", "username"]
+
+
+def test_get_multi_pages_forward_and_back_with_cursors(run_db):
+    async def scenario(db):
+        for name in ("alice", "bob", "carol", "dave", "erin"):
+            await repository.create_user(db, _user(f"{name}@x.com", name), "hash")
+
+        pages = [await repository.get_multi(db, limit=2)]
+        while pages[-1].next_cursor is not None:
+            pages.append(await repository.get_multi(db, cursor=pages[-1].next_cursor, limit=2))
+        back = [await repository.get_multi(db, cursor=pages[-1].prev_cursor, limit=2)]
+        while back[-1].prev_cursor is not None:
+            back.append(await repository.get_multi(db, cursor=back[-1].prev_cursor, limit=2))
+        past_the_end = await repository.get_multi(
+            db, cursor=encode_cursor(datetime(2100, 1, 1), 999, FORWARD), limit=2
+        )
+        return pages, back, past_the_end
+
+    pages, back, past_the_end = run_db(scenario)
+
+    def names(page):
+        return [user.username for user in page.items]
+
+    assert [names(page) for page in pages] == [["alice", "bob"], ["carol", "dave"], ["erin"]]
+    assert pages[0].prev_cursor is None and pages[-1].next_cursor is None
+    assert [names(page) for page in back] == [["carol", "dave"], ["alice", "bob"]]
+    assert back[0].next_cursor == pages[1].next_cursor
+    assert back[-1].prev_cursor is None and back[-1].next_cursor is not None
+    assert (past_the_end.items, past_the_end.next_cursor, past_the_end.prev_cursor) == (
+        [],
+        None,
+        None,
+    )
+
+
+def test_get_many_returns_only_the_existing_users(run_db):
+    async def scenario(db):
+        for name in ("alice", "bob", "carol"):
+            await repository.create_user(db, _user(f"{name}@x.com", name), "hash")
+        return await repository.get_many(db, [3, 1, 99]), await repository.get_many(db, [])
+
+    users, none = run_db(scenario)
+
+    assert sorted(user.username for user in users) == ["alice", "carol"]
+    assert none == []
@@ -0,0 +1,179 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.src.auth.models import RevokedToken
+from app.src.auth.repository import AsyncRevokedTokenRepository
+from app.src.auth.revocation import (
+    BloomFilter,
+    Denylist,
+    DenylistSynchronizer,
+    user_revocation_id,
+)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_denylist_keeps_entries_until_token_expiry(monkeypatch):
+    denylist = Denylist(capacity=100, error_rate=0.01)
+    now = time.time()
+    denylist.add("live", now + 60)
+    denylist.add("already-expired", now - 1)
+
+    assert denylist.is_revoked("live") is True
+    assert denylist.is_revoked("already-expired") is False
+    assert denylist.is_revoked("never-revoked") is False
+
+    monkeypatch.setattr("app.src.auth.revocation.time.time", lambda: now + 61)
+    assert denylist.is_revoked("live") is False
+    assert denylist.prune() == 1
+    assert len(denylist) == 0
+
+
+def test_decode_access_token_rejects_revoked_tokens():
+    import app.src.auth.security as security
+
+    token = security.create_access_token({"sub": "1"})
+    payload = security.decode_access_token(token)
+    assert payload is not None and payload.get("jti")
+
+    security.denylist.add(payload["jti"], payload["exp"])
+    try:
+        assert security.decode_access_token(token) is None
+    finally:
+        security.denylist.clear()
+
+
+def test_user_revocations_cover_every_token_issued_before_them(monkeypatch):
+    denylist = Denylist(capacity=100, error_rate=0.01)
+    now = time.time()
+    denylist.add(user_revocation_id(7, now), now + 60)
+
+    assert denylist.is_user_revoked("7", now - 0.001) is True
+    assert denylist.is_user_revoked("7", None) is True
+    assert denylist.is_user_revoked("7", now + 0.001) is False
+    assert denylist.is_user_revoked("8", now - 1) is False
+    assert denylist.is_revoked(user_revocation_id(7, now)) is False
+
+    # An earlier revocation arriving late doesn't move the cutoff back
+    denylist.add(user_revocation_id(7, now - 30), now + 30)
+    assert denylist.is_user_revoked("7", now - 0.001) is True
+
+    monkeypatch.setattr("app.src.auth.revocation.time.time", lambda: now + 61)
+    assert denylist.is_user_revoked("7", now - 1) is False
+    assert denylist.prune() == 1
+    assert len(denylist) == 0
+
+
+def test_decode_access_token_rejects_tokens_issued_before_a_user_revocation():
+    import app.src.auth.security as security
+
+    before = security.create_access_token({"sub": "5"})
+    other_user = security.create_access_token({"sub": "6"})
+    revoked_at = time.time()
+    security.denylist.add(user_revocation_id(5, revoked_at), revoked_at + 60)
+    after = security.create_access_token({"sub": "5"})
+    try:
+        assert security.decode_access_token(before) is None
+        assert security.decode_access_token(other_user) is not None
+        assert security.decode_access_token(after) is not None
+    finally:
+        security.denylist.clear()
+
+
+def _revoked(jti, expires_in, revoked_ago=0.0, user_id=None):
+    now = datetime.utcnow()
+    return RevokedToken(
+        jti=jti,
+        user_id=user_id,
+        expires_at=now + timedelta(seconds=expires_in),
+        revoked_at=now - timedelta(seconds=revoked_ago),
+    )
+
+
+def test_synchronizer_loads_live_rows_and_purges_expired_ones(run_engines):
+    denylist = Denylist(capacity=100, error_rate=0.01)
+
+    async def scenario(engine):
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        issued_before = time.time()
+        async with sessions() as db:
+            db.add_all(
+                [
+                    _revoked("live", 60),
+                    _revoked("expired", -1),
+                    _revoked(user_revocation_id(3, issued_before), 60, user_id=3),
+                ]
+            )
+            await db.commit()
+
+        sync = DenylistSynchronizer(denylist, sessions, AsyncRevokedTokenRepository(), 60)
+        await sync.load()
+        async with sessions() as db:
+            stored = set((await db.execute(select(RevokedToken.jti))).scalars())
+        return stored, issued_before
+
+    stored, issued_before = run_engines(scenario)
+
+    assert stored == {"live", user_revocation_id(3, issued_before)}
+    assert denylist.is_revoked("live") is True
+    assert denylist.is_revoked("expired") is False
+    assert denylist.is_user_revoked("3", issued_before - 1) is True
+
+
+def test_synchronizer_refresh_picks_up_rows_committed_out_of_order(run_engines):
+    denylist = Denylist(capacity=100, error_rate=0.01)
+
+    async def scenario(engine):
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        sync = DenylistSynchronizer(denylist, sessions, AsyncRevokedTokenRepository(), 1)
+        async with sessions() as db:
+            db.add(_revoked("first", 60))
+            await db.commit()
+        await sync.load()
+
+        async with sessions() as db:
+            # Revoked a moment before "first" but committed after the last poll
+            db.add_all([_revoked("late", 60, revoked_ago=1), _revoked("new", 60)])
+            await db.commit()
+        await sync.refresh()
+
+    run_engines(scenario)
+
+    assert [denylist.is_revoked(jti) for jti in ("first", "late", "new")] == [True, True, True]
+
+
+def test_synchronizer_keeps_polling_after_a_failed_refresh():
+    calls = []
+
+    class FailingOnce(DenylistSynchronizer):
+        async def load(self):
+            pass
+
+        async def refresh(self):
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+
+    async def scenario():
+        sync = FailingOnce(Denylist(capacity=10, error_rate=0.01), None, None, 0)
+        await sync.start()
+        while len(calls) < 3:
+            await asyncio.sleep(0)
+        await sync.stop()
+        return sync._task
+
+    assert asyncio.run(scenario()) is None
+    assert calls[:3] == [0, 1, 2]
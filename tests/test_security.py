@@ -1,3 +1,6 @@
+import hashlib
+import time
+from datetime import timedelta
 from importlib import reload
 
 
@@ -21,3 +24,34 @@ def test_create_and_decode_token(monkeypatch):
     assert payload is not None
     assert payload.get("sub") == "123"
     assert payload.get("username") == "tester"
+
+
+def test_decode_access_token_serves_repeat_calls_from_cache(monkeypatch):
+    import app.src.auth.security as security
+
+    token = security.create_access_token({"sub": "42"})
+    security.token_cache.clear()
+
+    first = security.decode_access_token(token)
+    assert first is not None
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token should have been served from the cache")
+
+    monkeypatch.setattr(security.get_token_codec(), "decode", fail)
+    second = security.decode_access_token(token)
+
+    assert second == first
+    assert second is not first
+
+
+def test_decode_access_token_cache_entry_expires_with_token(monkeypatch):
+    import app.src.auth.security as security
+
+    token = security.create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=30))
+    security.token_cache.clear()
+    assert security.decode_access_token(token) is not None
+
+    now = time.monotonic()
+    monkeypatch.setattr("app.src.auth.cache.time.monotonic", lambda: now + 31)
+    assert security.token_cache.get(hashlib.sha256(token.encode()).digest()) is None
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.startup import StartupReport
+
+
+def test_report_records_phases_and_background_jobs():
+    report = StartupReport(time.perf_counter())
+    report.mark_imported()
+
+    async def run():
+        with report.phase("schema"):
+            await asyncio.sleep(0)
+        report.run_in_background("warmup", asyncio.sleep(0.01))
+        report.run_in_background("broken", asyncio.sleep("not a number"))
+        report.mark_ready()
+        await report.wait_for_background()
+
+    asyncio.run(run())
+    result = report.as_dict()
+
+    assert set(result["phases"]) == {"schema"}
+    assert result["import_seconds"] <= result["ready_seconds"]
+    assert result["background"]["warmup"] >= 0.01
+    assert result["background"]["broken"] == "failed"
+
+
+def test_schema_version_check():
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.db.schema import schema_is_current, schema_version, stamp_schema_version
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            before = await schema_is_current(engine)
+            async with engine.begin() as connection:
+                await connection.run_sync(schema_version.create)
+                await connection.run_sync(stamp_schema_version)
+                await connection.run_sync(stamp_schema_version)
+            return before, await schema_is_current(engine)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == (False, True)
+
+
+def test_only_the_login_indexes_wait_for_migrate():
+    from app.db.schema import SCHEMA_VERSION, is_online_index, schema_version
+    from app.db.session import create_tables, engine
+    from app.src.auth.models import User
+
+    online = {index.name for index in User.__table__.indexes if is_online_index(index)}
+    assert online == {"uq_users_email_lower", "uq_users_username_lower"}
+
+    # Outside Postgres every index is built inline, so the version gets stamped
+    assert create_tables() == []
+    assert create_tables(build_online_indexes=True) == []
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.max(schema_version.c.version))) == SCHEMA_VERSION
+
+
+def test_unique_lower_indexes_wait_for_case_conflicts_to_be_fixed(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine, insert, text
+
+    from app.db import session
+    from app.src.auth.models import User
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(session, "engine", engine)
+    session.create_tables()
+    with engine.begin() as connection:
+        # A database from SCHEMA_VERSION 2: non-unique indexes and rows differing in case
+        for column in ("email", "username"):
+            connection.execute(text(f"DROP INDEX uq_users_{column}_lower"))
+            connection.execute(
+                text(f"CREATE INDEX ix_users_{column}_lower ON users (lower({column}))")
+            )
+        connection.execute(
+            insert(User.__table__),
+            [
+                {"email": "a@x.com", "username": "ann", "hashed_password": "h"},
+                {"email": "A@x.com", "username": "bob", "hashed_password": "h"},
+            ],
+        )
+
+    def indexes():
+        # Reflection skips expression indexes on SQLite
+        with engine.connect() as connection:
+            return set(
+                connection.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+            )
+
+    assert session.create_tables(build_online_indexes=True) == ["uq_users_email_lower"]
+    assert {"ix_users_email_lower", "uq_users_username_lower"} <= indexes()
+    assert "ix_users_username_lower" not in indexes()
+
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE users SET email = 'b@x.com' WHERE username = 'bob'"))
+    assert session.create_tables(build_online_indexes=True) == []
+    assert "ix_users_email_lower" not in indexes()
+    assert "uq_users_email_lower" in indexes()